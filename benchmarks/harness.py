@@ -0,0 +1,181 @@
+"""
+Benchmark harness
+Generalizes test3/profiler.py to named pipeline stages from every project.
+A stage is registered with a setup function that builds its input for a
+given size (not timed) and a run function that does the work (timed):
+
+    @stage("test3.validate", folder="test3", sizes=(1_000, 10_000))
+    def validate(size):
+        from bird_pipeline import validate_batch
+        df = make_frame(size)              # setup
+        return lambda: validate_batch(df)  # run
+
+For each (stage, size) the harness does `warmup` untimed runs, `repeat`
+timed runs, one run under tracemalloc for peak memory and one under
+cProfile for the hottest functions, and writes everything to JSON.
+Results can be compared with a stored baseline to flag regressions.
+"""
+import cProfile
+import gc
+import io
+import json
+import os
+import platform
+import pstats
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TOLERANCE = 0.25   # slower than baseline by more than 25% is a regression
+MIN_DELTA_SECONDS = 0.005  # ignore slowdowns smaller than timer / scheduler noise
+PROFILE_TOP = 10           # cProfile entries kept per stage, as in test3/profiler.py
+
+# stage name -> {"setup": setup(size) -> run(), "folder": project folder, "sizes": default sizes}
+STAGES = {}
+
+
+def stage(name, folder, sizes=(1_000,)):
+    """
+    Decorator: register setup(size) -> run() as a benchmark stage.
+    Setup and every run happen inside `folder` (see in_folder).
+    """
+    def decorator(setup):
+        STAGES[name] = {"setup": setup, "folder": folder, "sizes": tuple(sizes)}
+        return setup
+    return decorator
+
+
+@contextmanager
+def in_folder(folder):
+    """
+    Run with a project folder as working directory and on sys.path, so its
+    flat imports (e.g. `from bird_model import ...`) and relative data paths work.
+    """
+    path = os.path.join(REPO_ROOT, folder)
+    cwd = os.getcwd()
+    sys.path.insert(0, path)
+    os.chdir(path)
+    try:
+        yield path
+    finally:
+        os.chdir(cwd)
+        sys.path.remove(path)
+
+
+def _profile_summary(run, top=PROFILE_TOP):
+    """Top cProfile entries of one run, by cumulative time."""
+    profiler = cProfile.Profile()
+    profiler.runcall(run)
+    stats = pstats.Stats(profiler, stream=io.StringIO()).stats
+    entries = []
+    for (filename, line, func), (_, ncalls, tottime, cumtime, _) in stats.items():
+        if filename.startswith(REPO_ROOT):
+            filename = os.path.relpath(filename, REPO_ROOT)
+        entries.append({"function": f"{filename}:{line}({func})", "ncalls": ncalls,
+                        "tottime": round(tottime, 6), "cumtime": round(cumtime, 6)})
+    entries.sort(key=lambda e: e["cumtime"], reverse=True)
+    return entries[:top]
+
+
+def _peak_memory(run):
+    """Peak bytes allocated by Python during one run."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark(name, size, warmup=1, repeat=5, profile=True):
+    """Benchmark one stage at one input size; returns a result dict."""
+    # stages print progress and warnings; keep them out of the report
+    with in_folder(STAGES[name]["folder"]), redirect_stdout(io.StringIO()):
+        run = STAGES[name]["setup"](size)
+        for _ in range(warmup):
+            run()
+
+        times = []
+        for _ in range(repeat):
+            gc.collect()
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+
+        result = {
+            "stage": name,
+            "size": size,
+            "warmup": warmup,
+            "repeat": repeat,
+            "wall_seconds": {"min": min(times), "median": statistics.median(times),
+                             "mean": statistics.mean(times), "runs": times},
+            "items_per_sec": size / statistics.median(times),
+            "peak_memory_bytes": _peak_memory(run),
+        }
+        if profile:
+            result["profile"] = _profile_summary(run)
+    return result
+
+
+def run_benchmarks(names=None, sizes=None, warmup=1, repeat=5, profile=True, log=print):
+    """
+    Run the named stages (all by default), each at `sizes` or its own
+    default sizes. Returns a report dict ready for save_report.
+    """
+    names = names or list(STAGES)
+    unknown = [n for n in names if n not in STAGES]
+    if unknown:
+        raise KeyError(f"Unknown stage(s): {', '.join(unknown)}; known: {', '.join(STAGES)}")
+
+    results = []
+    for name in names:
+        for size in sizes or STAGES[name]["sizes"]:
+            result = benchmark(name, size, warmup, repeat, profile)
+            results.append(result)
+            if log:
+                log(f"{name:<28} {size:>10,} {result['wall_seconds']['median'] * 1000:>10.2f} ms"
+                    f" {result['peak_memory_bytes'] / 1024 ** 2:>9.1f} MB")
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+
+
+def save_report(report, path):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def load_report(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def find_regressions(report, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare median wall time and peak memory of every (stage, size) found in
+    both reports. Returns a list of regressions: entries more than
+    `tolerance` (a fraction) slower or bigger than the baseline; wall-time
+    changes under MIN_DELTA_SECONDS are treated as noise.
+    """
+    previous = {(r["stage"], r["size"]): r for r in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        base = previous.get((result["stage"], result["size"]))
+        if base is None:
+            continue
+        checks = [("wall_seconds", result["wall_seconds"]["median"], base["wall_seconds"]["median"], MIN_DELTA_SECONDS),
+                  ("peak_memory_bytes", result["peak_memory_bytes"], base["peak_memory_bytes"], 0)]
+        for metric, now, before, min_delta in checks:
+            if before > 0 and now > before * (1 + tolerance) and now - before > min_delta:
+                regressions.append({"stage": result["stage"], "size": result["size"], "metric": metric,
+                                    "baseline": before, "current": now, "ratio": round(now / before, 3)})
+    return regressions
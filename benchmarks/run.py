@@ -0,0 +1,75 @@
+"""
+Run the pipeline benchmarks and check them against a baseline.
+
+    python benchmarks/run.py                          # every stage, default sizes
+    python benchmarks/run.py --stages test3,hw2.clean --sizes 1000,10000
+    python benchmarks/run.py --save-baseline          # store this run as the baseline
+    python benchmarks/run.py --baseline benchmarks/baseline.json --tolerance 0.2
+
+Exits with status 1 if any stage regressed against the baseline.
+"""
+import argparse
+import os
+import sys
+import harness
+import stages  # noqa: F401  (registers the stages)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RESULTS_PATH = os.path.join(HERE, "results.json")
+BASELINE_PATH = os.path.join(HERE, "baseline.json")
+
+
+def select_stages(patterns):
+    """Stage names matching each pattern exactly or as a prefix (`test3` -> `test3.*`)."""
+    if not patterns:
+        return list(harness.STAGES)
+    selected = []
+    for pattern in patterns:
+        matches = [n for n in harness.STAGES if n == pattern or n.startswith(pattern + ".")]
+        if not matches:
+            sys.exit(f"No stage matches {pattern!r}; known: {', '.join(harness.STAGES)}")
+        selected += [m for m in matches if m not in selected]
+    return selected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the test3, HW2, HW3 and HW5 pipeline stages.")
+    parser.add_argument("--stages", default="", help="comma-separated stage names or project prefixes")
+    parser.add_argument("--sizes", default="", help="comma-separated input sizes (default: each stage's own)")
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-profile", action="store_true", help="skip the cProfile summaries")
+    parser.add_argument("--output", default=RESULTS_PATH)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=harness.DEFAULT_TOLERANCE,
+                        help="allowed slowdown / memory growth before flagging, as a fraction")
+    parser.add_argument("--save-baseline", action="store_true", help="also write the results as the baseline")
+    args = parser.parse_args()
+
+    names = select_stages([s for s in args.stages.split(",") if s])
+    sizes = [int(s) for s in args.sizes.split(",") if s] or None
+
+    print(f"{'stage':<28} {'size':>10} {'median':>13} {'peak mem':>12}")
+    report = harness.run_benchmarks(names, sizes, args.warmup, args.repeat, not args.no_profile)
+    harness.save_report(report, args.output)
+    print(f"\nSaved {args.output}")
+
+    if args.save_baseline:
+        harness.save_report(report, args.baseline)
+        print(f"Saved baseline {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against (run with --save-baseline to create one).")
+        return
+    regressions = harness.find_regressions(report, harness.load_report(args.baseline), args.tolerance)
+    for r in regressions:
+        print(f"REGRESSION {r['stage']} size={r['size']:,} {r['metric']}: "
+              f"{r['baseline']:.4g} -> {r['current']:.4g} ({r['ratio']:.2f}x)")
+    if regressions:
+        sys.exit(1)
+    print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%}).")
+
+
+if __name__ == "__main__":
+    main()
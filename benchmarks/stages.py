@@ -0,0 +1,200 @@
+"""
+Benchmark stages for test3, HW2, HW3 and HW5.
+Each stage builds a synthetic input of the requested size in its setup
+(HW3 uses its real dataset), imports the project module from inside its
+folder, and returns the function to time. Stages must not modify their
+input or leave module state changed, since the same input is reused for
+every run and later stages import the same modules in the same process.
+"""
+import atexit
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from harness import stage
+
+SEED = 0
+SPECIES = ["Puffinus puffinus", "Fratercula arctica", "Morus bassanus",
+           "Larus argentatus", "Sturnus vulgaris", "Turdus migratorius"]
+
+
+def _rng():
+    return np.random.default_rng(SEED)
+
+
+def _temp_path(suffix):
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    os.close(fd)
+    atexit.register(lambda: os.path.exists(path) and os.remove(path))
+    return path
+
+
+# ── test3: bird observations ─────────────────────────────────────────────────
+
+def gbif_export(size):
+    """Raw GBIF occurrence rows, a few percent of them invalid."""
+    rng = _rng()
+    dates = pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 1400, size), "D")
+    return pd.DataFrame({
+        "gbifID": np.arange(size),
+        "occurrenceID": [f"urn:occ:{i}" for i in range(size)],
+        "species": rng.choice(SPECIES, size),
+        "decimalLatitude": np.where(rng.random(size) < 0.01, 95.0, rng.uniform(-60, 70, size)),
+        "decimalLongitude": rng.uniform(-179, 179, size),
+        "eventDate": dates.strftime("%Y-%m-%dT%H:%M:%S"),
+        "countryCode": rng.choice(["US", "CA", "IS", "GB"], size),
+        "individualCount": np.where(rng.random(size) < 0.05, 0, rng.integers(1, 9, size)),
+        "basisOfRecord": "HUMAN_OBSERVATION",
+    })
+
+
+@stage("test3.clean_validate", folder="test3", sizes=(1_000, 10_000, 100_000))
+def test3_clean_validate(size):
+    from bird_pipeline import clean_data, validate_batch
+    raw = gbif_export(size)
+    return lambda: validate_batch(clean_data(raw))
+
+
+@stage("test3.load_batch", folder="test3", sizes=(10_000, 100_000))
+def test3_load_batch(size):
+    from bird_pipeline import load_batch
+    path = _temp_path(".tsv")
+    gbif_export(size).to_csv(path, sep="\t", index=False)
+    return lambda: load_batch(path, workers=1)
+
+
+@stage("test3.filter_summarize", folder="test3", sizes=(10_000, 100_000))
+def test3_filter_summarize(size):
+    from bird_pipeline import build_batch, filter_observations, summarize_by_species, clean_data
+    batch = build_batch(clean_data(gbif_export(size)))
+    return lambda: summarize_by_species(filter_observations(batch, min_count=2, seasons=["Summer", "Fall"]))
+
+
+@stage("test3.simulation", folder="test3", sizes=(10_000, 100_000))
+def test3_simulation(size):
+    from bird_pipeline import build_batch, clean_data, iter_monthly_tallies
+    batch = build_batch(clean_data(gbif_export(size)))
+    return lambda: list(iter_monthly_tallies(batch, top_n=5))
+
+
+# ── HW2: biodiversity pipeline ────────────────────────────────────────────────
+
+def bird_observations(size):
+    """fetch_gbif_data-shaped rows with some duplicates, gaps and bad dates."""
+    rng = _rng()
+    dates = pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 365 * 24, size), "h")
+    df = pd.DataFrame({
+        "species_name": rng.choice(SPECIES[:3], size),
+        "latitude": rng.uniform(25, 49, size).round(4),
+        "longitude": rng.uniform(-124, -67, size).round(4),
+        "date": dates.strftime("%Y-%m-%dT%H:%M"),
+        "state": rng.choice(["Massachusetts", "New York", "Texas", None, "Ontario"], size),
+        "coordinate_uncertainty": rng.choice([15.0, 100.0, np.nan], size),
+    })
+    df.loc[rng.random(size) < 0.02, "date"] = "not-a-date"
+    return pd.concat([df, df.sample(frac=0.05, random_state=SEED)], ignore_index=True).head(size)
+
+
+@stage("hw2.clean", folder="homeworks/HW2", sizes=(10_000, 100_000))
+def hw2_clean(size):
+    from pipeline import clean_biodiversity_data
+    raw = bird_observations(size)
+    return lambda: clean_biodiversity_data(raw)
+
+
+@stage("hw2.enrich", folder="homeworks/HW2", sizes=(10_000, 100_000))
+def hw2_enrich(size):
+    from pipeline import clean_biodiversity_data, enrich_with_state_coordinates, build_state_index, \
+        STATE_BOUNDS_PATH
+    cleaned, _ = clean_biodiversity_data(bird_observations(size))
+    state_ref = pd.read_csv("state_reference.csv")
+    state_index = build_state_index(pd.read_csv(STATE_BOUNDS_PATH))
+    return lambda: enrich_with_state_coordinates(cleaned, state_ref, state_index)
+
+
+@stage("hw2.aggregate", folder="homeworks/HW2", sizes=(10_000, 100_000))
+def hw2_aggregate(size):
+    from pipeline import clean_biodiversity_data, enrich_with_state_coordinates, aggregate_observations
+    cleaned, _ = clean_biodiversity_data(bird_observations(size))
+    enriched = enrich_with_state_coordinates(cleaned, pd.read_csv("state_reference.csv"))
+    return lambda: aggregate_observations(enriched)
+
+
+# ── HW3: cause of deaths dashboard API ────────────────────────────────────────
+
+# module globals _build_store assigns; saved and put back around each timed build
+HW3_STORE = ("_country_pos", "_year_pos", "_disease_pos", "_cube", "_row_pos",
+             "_row_country", "_year_rows", "_labels")
+
+
+@stage("hw3.build_store", folder="homeworks/HW3", sizes=(1_000, 6_120))  # 6,120 = every row
+def hw3_build_store(size):
+    import api_layer as api
+    df = api.load_data().head(size)
+
+    def run():
+        saved = {name: getattr(api, name) for name in HW3_STORE}
+        try:
+            api._build_store(df)
+        finally:
+            for name, value in saved.items():
+                setattr(api, name, value)
+    return run
+
+
+@stage("hw3.queries", folder="homeworks/HW3", sizes=(100, 1_000))
+def hw3_queries(size):
+    """`size` dashboard queries (top countries + summary stats) over random years and diseases."""
+    import api_layer as api
+    api.load_data()
+    rng = _rng()
+    years = rng.choice(api.get_years(), size)
+    diseases = rng.choice(api.get_diseases(), size)
+
+    def run():
+        for year, disease in zip(years.tolist(), diseases.tolist()):
+            api.get_top_countries(disease, year)
+            api.get_summary_stats(disease, year)
+    return run
+
+
+# ── HW5: MBTA Orange Line ─────────────────────────────────────────────────────
+
+def lamp_rows(size):
+    """LAMP on-time-performance rows for the Orange Line, with repeats and gaps."""
+    from acquire import ORANGE_LINE_STOPS
+    rng = _rng()
+    days = rng.integers(1, 29, size)
+    return pd.DataFrame({
+        "trip_id": rng.integers(0, max(size // 20, 1), size).astype(str),
+        "stop_id": rng.integers(70001, 70040, size).astype(str),
+        "service_date": 20260200 + days,
+        "stop_timestamp": 1_770_000_000 + days * 86_400 + rng.integers(0, 86_400, size),
+        "travel_time_seconds": np.where(rng.random(size) < 0.03, np.nan, rng.integers(60, 400, size)),
+        "scheduled_travel_time": rng.integers(60, 300, size).astype(float),
+        "parent_station": rng.choice(ORANGE_LINE_STOPS, size),
+        "trunk_route_id": "Orange",
+    })
+
+
+@stage("hw5.clean", folder="homeworks/HW5", sizes=(10_000, 100_000))
+def hw5_clean(size):
+    from acquire import clean_data
+    raw = lamp_rows(size)
+    return lambda: clean_data(raw)
+
+
+@stage("hw5.trip_durations", folder="homeworks/HW5", sizes=(10_000, 100_000))
+def hw5_trip_durations(size):
+    from acquire import clean_data, get_trip_durations
+    df = clean_data(lamp_rows(size))
+    return lambda: get_trip_durations(df)
+
+
+@stage("hw5.stop_day_table", folder="homeworks/HW5", sizes=(10_000, 100_000))
+def hw5_stop_day_table(size):
+    from acquire import clean_data, get_station_order
+    from model import SubwayLine
+    line = SubwayLine(route_name="Orange Line", route_id="Orange",
+                      df=clean_data(lamp_rows(size)), station_order=get_station_order())
+    return lambda: line.travel_by_stop_and_day
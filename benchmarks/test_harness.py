@@ -0,0 +1,29 @@
+import harness
+
+
+def _report(seconds, memory):
+    return {"results": [{"stage": "toy", "size": 10, "wall_seconds": {"median": seconds},
+                         "peak_memory_bytes": memory}]}
+
+
+def test_benchmark_records_time_memory_and_profile():
+    """A registered stage is timed, traced and profiled at the requested size."""
+    @harness.stage("toy.sum", folder="benchmarks", sizes=(10,))
+    def toy(size):
+        return lambda: sum(list(range(size)))
+
+    result = harness.benchmark("toy.sum", 1000, warmup=1, repeat=3)
+    assert result["size"] == 1000
+    assert len(result["wall_seconds"]["runs"]) == 3
+    assert result["peak_memory_bytes"] > 0
+    assert result["profile"]
+    del harness.STAGES["toy.sum"]
+
+
+def test_find_regressions_flags_slowdowns_and_memory_growth():
+    """Only changes beyond the tolerance (and the noise floor) are flagged."""
+    baseline = _report(0.100, 1_000)
+    assert harness.find_regressions(_report(0.110, 1_100), baseline, tolerance=0.25) == []
+    regressions = harness.find_regressions(_report(0.200, 5_000), baseline, tolerance=0.25)
+    assert [r["metric"] for r in regressions] == ["wall_seconds", "peak_memory_bytes"]
+    assert harness.find_regressions(_report(0.004, 1_000), _report(0.001, 1_000)) == []
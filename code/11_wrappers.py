@@ -3,6 +3,8 @@ Lecture 2: Reusable Sankey Components & Multi-Layer Visualization
 Building wrapper functions and dataframe stacking techniques
 """
 
+import time
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.io as pio
@@ -10,37 +12,71 @@ import plotly.io as pio
 # pio.renderers.default = "browser"
 
 
-def _code_mapping(df, src, targ):
-    """Map labels in src and targ columns to integers.
-    Return the df and labels
-    Talk about internal/helper functions."""
-
-    # collect all the unique src and target strings
-    all_labels = pd.concat([df[src], df[targ]]).unique()
-
-    # assign each one a number starting from 0
-
-    # create a mapping (dict)
-    labels = { }
-    for i in range(len(all_labels)):
-        labels[all_labels[i]] = i
-
-    # update the src and targ columns in the df
-    df[src] = df[src].map(lambda val: labels[val])
-    df[targ] = df[targ].map(lambda val: labels[val])
-    return df, labels
-
-
-def make_sankey(df, src, targ, vals, **kwargs):
+def _code_mapping(df, src, targ, *layers, labels=None):
+    """Map labels in the src, targ (and any further layer) columns to integers.
+    All columns are encoded in one vectorized pd.factorize pass.
+    Returns an encoded copy of the df (the caller's df is left untouched)
+    and the label -> code dict.
+    labels : optional label -> code dict from a previous call, so node order
+             stays the same across redraws; unseen labels are appended."""
+    cols = [src, targ, *layers]
+
+    # stack every layer column so one label gets one code everywhere
+    stacked = pd.concat([df[col] for col in cols], ignore_index=True)
+
+    if labels is None:
+        codes, uniques = pd.factorize(stacked, use_na_sentinel=False)
+    else:
+        uniques = pd.Index(list(labels))
+        codes = uniques.get_indexer(stacked)
+        if (codes < 0).any():
+            uniques = uniques.append(pd.Index(pd.unique(stacked[codes < 0])))
+            codes = uniques.get_indexer(stacked)
+    labels = dict(zip(uniques, range(len(uniques))))
+
+    # split the codes back into one column per layer
+    n = len(df)
+    encoded = df.assign(**{col: codes[i * n:(i + 1) * n] for i, col in enumerate(cols)})
+    return encoded, labels
+
+
+def _stage_links(df, stages, vals=None, labels=None):
+    """Aggregate the flows between every adjacent pair of stage columns.
+    All pairs are counted in one groupby over the integer node codes, so
+    duplicate links are merged.
+    vals : column to sum for each link; None counts rows.
+    Return a (source, target, value) link table and the labels."""
+    encoded, labels = _code_mapping(df, *stages, labels=labels)
+    values = np.ones(len(df), dtype=int) if vals is None else df[vals].to_numpy()
+
+    # line up each stage with the next one: (s0 -> s1), (s1 -> s2), ...
+    src = np.concatenate([encoded[col].to_numpy() for col in stages[:-1]])
+    targ = np.concatenate([encoded[col].to_numpy() for col in stages[1:]])
+    n = len(labels)
+    flows = pd.Series(np.tile(values, len(stages) - 1)).groupby(src * n + targ).sum()
+
+    links = pd.DataFrame({"source": flows.index // n,
+                          "target": flows.index % n,
+                          "value": flows.to_numpy()})
+    return links, labels
+
+
+def make_sankey(df, src, targ=None, vals=None, **kwargs):
     """Generate a sankey diagram from dataframe.
     Talk about keyword args and positional args
+    src can also be an ordered list of stage columns, e.g.
+    [admission_rate, control, median_earnings_10yr], to draw one
+    layer of links per adjacent pair of stages.
+    vals : column with link values; None counts rows
     line_width : width of line for links
+    labels : label -> code dict to reuse a previous node order
     """
-    df, mapping = _code_mapping(df, src, targ)
+    stages = list(src) if isinstance(src, (list, tuple)) else [src, targ]
+    links, mapping = _stage_links(df, stages, vals, labels=kwargs.get("labels"))
 
     line_width = kwargs.get("line_width", None)
 
-    link = {"source": df[src], "target": df[targ], "value": df[vals],
+    link = {"source": links["source"], "target": links["target"], "value": links["value"],
             "line": {"width": line_width}}
     node = {"label": list(mapping.keys())}
     fig = go.Figure(go.Sankey(link=link, node=node))
@@ -71,6 +107,30 @@ def demo_multi_layer_stacking():
     fig = make_sankey(combined, "source", "target", "value")
     fig.show()
 
+def demo_multi_layer_stages():
+    """Multi-layer Sankey straight from stage columns, no stacking needed:
+    control → locale → selectivity → completion → earnings (college scorecard).
+    """
+    college = pd.read_csv('data/college-scorecard.csv')
+    stages = pd.DataFrame({
+        "control": college["control"].map(
+            {1: "Public", 2: "Private nonprofit", 3: "Private for-profit"}),
+        "locale": (college["locale"] // 10).map(
+            {1: "City", 2: "Suburb", 3: "Town", 4: "Rural"}),
+        "selectivity": pd.cut(college["admission_rate"], [0, 0.30, 0.70, 1.0],
+                              labels=["Highly Selective", "Selective", "Open Access"]),
+        "completion": pd.cut(college["completion_rate"], [0, 0.40, 0.60, 1.0],
+                             labels=["Low completion", "Medium completion", "High completion"]),
+        "earnings": pd.cut(college["median_earnings_10yr"], [0, 32000, 43000, 56000, 250000],
+                           labels=["< $32k", "$32-43k", "$43-56k", "> $56k"]),
+    }).dropna().astype(str)
+
+    start = time.perf_counter()
+    fig = make_sankey(stages, list(stages.columns))
+    print(f"5-layer sankey over {len(stages)} colleges built in "
+          f"{(time.perf_counter() - start) * 1000:.1f} ms")
+    fig.show()
+
 def practice_creating_sankey():
     '''Practice your own sankey diagram. Use the college dataset to study
     flow of students through the higher ed syste. You can use columns like
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the tests patch the shared response cache (shared/http_cache.py), so load it
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
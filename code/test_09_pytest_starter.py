@@ -9,11 +9,15 @@ import dotenv
 import requests
 import os
 from unittest.mock import patch
+from http_cache import ResponseCache   # shared/http_cache.py, put on sys.path by conftest.py
 
 # OpenAQ API Key from Lecture 6/7
 dotenv.load_dotenv()
 AIR_QUALITY_PATH = "data/air_quality.csv"
 
+# re-runs with the same query are answered from disk (see shared/http_cache.py)
+HTTP_CACHE = ResponseCache()
+
 # From Day 7
 def get_air_quality_data():
     """
@@ -30,8 +34,8 @@ def get_air_quality_data():
     hardcoded_fields = {"neighborhood": "Roxbury",
                         "sensor": "pm25",
                         "units": "cubic microns"}
-    #make the request
-    response = requests.get(url, params={}, headers=headers)
+    #make the request (cached on disk)
+    response = HTTP_CACHE.get(url, params={}, headers=headers)
 
     # if error, send out an empty dataframe
     if response.status_code != 200:
@@ -136,6 +140,14 @@ def test_calculate_average(sample_air_quality):
 # MOCKING API CALLS
 ###############################################################################
 
+@pytest.fixture(autouse=True)
+def no_http_cache(monkeypatch):
+    """Mocked responses must reach the function every time, not a cached copy"""
+    monkeypatch.setattr(HTTP_CACHE, "get",
+                        lambda url, params=None, headers=None, **kwargs:
+                        requests.get(url, params=params, headers=headers))
+
+
 @pytest.fixture
 def mock_openaq_response():
     """Sample OpenAQ API response"""
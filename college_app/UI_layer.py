@@ -17,8 +17,9 @@ Pick a state and see selectiveness to median income flow/grad rates
 - RadioGroup -- see grad rates vs median income
 """
 import panel as pn
-import sankey as sk
+import Visualization_layer as sk
 import college_api_mock as college_api
+from scheduler import CallbackScheduler
 
 # DIMENSIONS
 CARD_WIDTH = 320
@@ -28,25 +29,64 @@ def main():
     pn.extension()
 
     # Initialize API
-    api = college_api.college_api_mock(college_api.DATA_FILE_PATH)
-    api.proccess_data()
+    api = college_api.CollegeAPI(college_api.DATA_FILE_PATH)
+    api.process_data()
 
     # WIDGET DECLARATIONS
     state_slct = pn.widgets.Select(name = 'State', options = api.get_states())
     enrollment_sldr = pn.widgets.IntSlider(name = 'Enrollment', start=0, end = 100000, step = 10, value=0)
 
     # Search Widgets
+    right_layer_radio = pn.widgets.RadioButtonGroup(
+        name='Outcome', options=college_api.RIGHT_LAYER_COL_NAMES,
+        value=college_api.RIGHT_LAYER_COL_NAMES[0])
+
     # Plotting widgets
+    width_sldr = pn.widgets.IntSlider(name='Width', start=250, end=2000, step=50, value=800)
+    height_sldr = pn.widgets.IntSlider(name='Height', start=200, end=2500, step=50, value=600)
+
+    # OUTPUT PANES (filled in by the scheduled callbacks)
+    table_pane = pn.widgets.Tabulator(api.get_subset(), pagination='remote', page_size=20,
+                                      sizing_mode='stretch_width')
+    plot_pane = pn.pane.Plotly(None)
 
     # CALLBACK FUNCTIONS
+    def get_catalog(state, min_enrollment):
+        return api.get_subset(state, min_enrollment)
+
+    def get_plot(state, min_enrollment, right_layer, width, height):
+        flow = api.get_flow(state, college_api.LEFT_LAYER_COL_NAME, right_layer, min_enrollment)
+        return sk.make_sankey(flow, college_api.LEFT_LAYER_COL_NAME, right_layer, 'count',
+                              width=width, height=height)
+
+    # Bursts of widget events (e.g. dragging the slider) are coalesced and only
+    # the latest request is computed, off the UI thread; see scheduler.py
+    catalog_scheduler = CallbackScheduler(get_catalog, lambda df: setattr(table_pane, 'value', df))
+    plot_scheduler = CallbackScheduler(get_plot, lambda fig: setattr(plot_pane, 'object', fig))
+
     # CALLBACK BINDINGS (Connecting widgets to callback functions)
+    def on_search_change(*events):
+        catalog_scheduler.submit(state_slct.value, enrollment_sldr.value)
+        on_plot_change()
+
+    def on_plot_change(*events):
+        plot_scheduler.submit(state_slct.value, enrollment_sldr.value, right_layer_radio.value,
+                              width_sldr.value, height_sldr.value)
+
+    state_slct.param.watch(on_search_change, 'value')
+    enrollment_sldr.param.watch(on_search_change, 'value')
+    right_layer_radio.param.watch(on_plot_change, 'value')
+    width_sldr.param.watch(on_plot_change, 'value')
+    height_sldr.param.watch(on_plot_change, 'value')
+    plot_pane.object = get_plot(state_slct.value, enrollment_sldr.value, right_layer_radio.value,
+                                width_sldr.value, height_sldr.value)
 
     # DASHBOARD WIDGET CONTAINERS ("CARDS")
     search_card = pn.Card(
         pn.Column(
             state_slct,
             enrollment_sldr,
-            # Widget 3
+            right_layer_radio,
         ),
         title="Search", width=CARD_WIDTH, collapsed=False
     )
@@ -54,9 +94,8 @@ def main():
 
     plot_card = pn.Card(
         pn.Column(
-            # Widget 1
-            # Widget 2
-            # Widget 3
+            width_sldr,
+            height_sldr,
         ),
 
         title="Plot", width=CARD_WIDTH, collapsed=True
@@ -74,8 +113,8 @@ def main():
         theme_toggle=False,
         main=[
             pn.Tabs(
-                ("Dataset", None),  # Replace None with callback binding
-                ("Plot", None),  # Replace None with callback binding
+                ("Dataset", table_pane),
+                ("Plot", plot_pane),
                 active=1  # Which tab is active by default?
             )
         ],
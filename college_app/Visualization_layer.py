@@ -3,44 +3,81 @@ make sankey diagram that targets 1 of the 2 columns/data
 customize sankey with width and height
 make the actual diagram
 """
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 
 
-def _code_mapping(df, src, targ):
-    """Map labels in src and targ columns to integers.
-    Return the df and labels
-    Talk about internal/helper functions."""
+def _code_mapping(df, src, targ, *layers, labels=None):
+    """Map labels in the src, targ (and any further layer) columns to integers.
+    Nodes are keyed by (column position, label), so the same label in two
+    columns (e.g. 'Unspecified' completion and earnings) gives two nodes
+    and never a self-loop. All columns are encoded in one pd.factorize pass.
+    Returns an encoded copy of the df (the caller's df is left untouched)
+    and the (position, label) -> code dict.
+    labels : optional (position, label) -> code dict from a previous call, so
+             node order stays the same across redraws; unseen nodes are appended."""
+    cols = [src, targ, *layers]
+    n = len(df)
 
-    # collect all the unique src and target strings
-    all_labels = pd.concat([df[src], df[targ]]).unique()
+    # stack every layer column, tagged with its position
+    stacked = pd.concat([df[col] for col in cols], ignore_index=True)
+    keys = pd.MultiIndex.from_arrays([np.repeat(np.arange(len(cols)), n), stacked])
 
-    # assign each one a number starting from 0
+    if labels is None:
+        codes, uniques = pd.factorize(keys, use_na_sentinel=False)
+    else:
+        uniques = pd.MultiIndex.from_tuples(list(labels), names=keys.names)
+        codes = uniques.get_indexer(keys)
+        if (codes < 0).any():
+            uniques = uniques.append(keys[codes < 0].unique())
+            codes = uniques.get_indexer(keys)
+    labels = dict(zip(uniques, range(len(uniques))))
 
-    # create a mapping (dict)
-    labels = { }
-    for i in range(len(all_labels)):
-        labels[all_labels[i]] = i
+    # split the codes back into one column per layer
+    encoded = df.assign(**{col: codes[i * n:(i + 1) * n] for i, col in enumerate(cols)})
+    return encoded, labels
 
-    # update the src and targ columns in the df
-    df[src] = df[src].map(lambda val: labels[val])
-    df[targ] = df[targ].map(lambda val: labels[val])
-    return df, labels
+def _stage_links(df, stages, vals=None, labels=None):
+    """Aggregate the flows between every adjacent pair of stage columns.
+    All pairs are counted in one groupby over the integer node codes, so
+    duplicate links are merged.
+    vals : column to sum for each link; None counts rows.
+    Return a (source, target, value) link table and the labels."""
+    encoded, labels = _code_mapping(df, *stages, labels=labels)
+    values = np.ones(len(df), dtype=int) if vals is None else df[vals].to_numpy()
 
-def make_sankey(df, src, targ, vals, **kwargs):
+    # line up each stage with the next one: (s0 -> s1), (s1 -> s2), ...
+    src = np.concatenate([encoded[col].to_numpy() for col in stages[:-1]])
+    targ = np.concatenate([encoded[col].to_numpy() for col in stages[1:]])
+    n = len(labels)
+    flows = pd.Series(np.tile(values, len(stages) - 1)).groupby(src * n + targ).sum()
+
+    links = pd.DataFrame({"source": flows.index // n,
+                          "target": flows.index % n,
+                          "value": flows.to_numpy()})
+    return links, labels
+
+def make_sankey(df, src, targ=None, vals=None, **kwargs):
     """Generate a sankey diagram from dataframe.
     Talk about keyword args and positional args
+    src can also be an ordered list of stage columns, e.g.
+    [admission_rate, control, median_earnings_10yr], to draw one
+    layer of links per adjacent pair of stages.
+    vals : column with link values; None counts rows
     line_width : width of line for links
+    labels : (stage position, label) -> code dict to reuse a previous node order
     """
-    df, mapping = _code_mapping(df, src, targ)
+    stages = list(src) if isinstance(src, (list, tuple)) else [src, targ]
+    links, mapping = _stage_links(df, stages, vals, labels=kwargs.get("labels"))
 
     line_width = kwargs.get("line_width", None)
     width = kwargs.get('width', 800)
     height = kwargs.get('height', 600)
 
-    link = {"source": df[src], "target": df[targ], "value": df[vals],
+    link = {"source": links["source"], "target": links["target"], "value": links["value"],
             "line": {"width": line_width}}
-    node = {"label": list(mapping.keys())}
+    node = {"label": [label for _, label in mapping]}
     fig = go.Figure(go.Sankey(link=link, node=node))
     fig.update_layout(
         autosize=False,
@@ -8,6 +8,11 @@ correctly.
 """
 from logging import critical
 
+import glob
+import hashlib
+import json
+import os
+import numpy as np
 import pandas as pd
 
 DATA_FILE_PATH = "college-scorecard.csv"
@@ -35,13 +40,24 @@ BIN_SPECS = {
                        'Medium-High (43-56k)', 'High (56-150k)']
         }
     }
+ALL_STATES = "All States"
+
+
+def _layer_codes(col):
+    """Integer codes and labels for a (binned) layer column; NaN gets -1."""
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        return col.cat.codes.to_numpy(), list(col.cat.categories)
+    codes, labels = pd.factorize(col)
+    return codes, list(labels)
 
 class CollegeAPI:
     def __init__(self, filename):
         """ Loads the data into the dataframe.
         filename: path to CSV file.
         """
-        self.college_data = pd.read_csv(DATA_FILE_PATH)
+        self.filename = filename
+        self.college_data = pd.read_csv(filename)
+        self._flow_index = {}
 
     def process_data(self, critical_columns=CRIT_COLS, imputable_columns=IMPUT_COLS, bin_specs=BIN_SPECS):
         """
@@ -51,22 +67,64 @@ class CollegeAPI:
         bin_specs: dict where key is column names, values can be:
             - int: number of quantiles (automatic binning)
             - dict: {'bins': [...], 'labels': [...]} for manual binning
+        Binned columns are stored as categoricals. The processed frame is cached
+        next to the CSV, keyed by the CSV contents and these args, so a restart
+        with the same data and specs just reloads it; only the latest entry is kept.
         :return: None. Mutates the dataframe in the object.
         """
-        #TODO: process the data
+        self._flow_index = {}
+        cache_path = self._cache_path(critical_columns, imputable_columns, bin_specs)
+        if os.path.exists(cache_path):
+            self.college_data = pd.read_pickle(cache_path)
+            return
+
+        df = self.college_data.dropna(subset=critical_columns)
+        df = df.fillna({col: -1 for col in imputable_columns})
+
+        binned = {}
+        for col, spec in bin_specs.items():
+            if isinstance(spec, int):
+                binned[col] = pd.qcut(df[col], q=spec, duplicates="drop")
+            else:
+                binned[col] = pd.cut(df[col], bins=spec['bins'], labels=spec['labels'],
+                                     include_lowest=True)
+        self.college_data = df.assign(**binned).reset_index(drop=True)
+
+        tmp_path = cache_path + ".tmp"
+        self.college_data.to_pickle(tmp_path)
+        os.replace(tmp_path, cache_path)
+        # entries for older CSV contents or other args would never be read again
+        for stale in glob.glob(f"{glob.escape(self.filename)}.*.processed.pkl"):
+            if stale != cache_path:
+                os.remove(stale)
+
+    def _cache_path(self, critical_columns, imputable_columns, bin_specs):
+        """Cache file for processed data: hash of the CSV bytes plus the processing args."""
+        digest = hashlib.sha256()
+        with open(self.filename, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        digest.update(json.dumps([critical_columns, imputable_columns, bin_specs],
+                                 sort_keys=True, default=str).encode())
+        return f"{self.filename}.{digest.hexdigest()[:16]}.processed.pkl"
 
     def get_states(self):
         """Returns sorted list of unique states for dropdown, with All States on top"""
         states = self.college_data[STATE_COL].unique().tolist()
         states.sort()
-        return ["All States"]
+        return [ALL_STATES] + states
 
-    def get_subset(self, state="All States",
+    def get_subset(self, state=ALL_STATES,
                  min_enrollment = 0):
-        """Returns the filtered subset of data."""
-        return self.college_data
+        """Returns the filtered subset of data.
+        Colleges with unknown enrollment count as 0."""
+        df = self.college_data
+        mask = df[ENROLLMENT_COL].fillna(0) >= min_enrollment
+        if state != ALL_STATES:
+            mask &= df[STATE_COL] == state
+        return df[mask]
 
-    def get_flow(self, state="All States",
+    def get_flow(self, state=ALL_STATES,
                  left_layer=LEFT_LAYER_COL_NAME,
                  right_layer=RIGHT_LAYER_COL_NAMES[0],
                  min_enrollment = 0):
@@ -75,15 +133,55 @@ class CollegeAPI:
         Includes "All States" in the counts.
         Filters by minimum enrollment.
         Returns the summary as a dataframe.
+        Answered from the precomputed flow index: a binary search for the
+        enrollment threshold plus one subtraction of cumulative counts.
         """
-        # old code!
+        left_labels, right_labels, partitions = self._flow_partitions(left_layer, right_layer)
+        if state not in partitions:
+            return pd.DataFrame({left_layer: [], right_layer: [], "count": []})
+
+        enrollment, cumulative = partitions[state]
+        start = np.searchsorted(enrollment, min_enrollment, side="left")
+        counts = cumulative[-1] - cumulative[start]
+
+        pairs = np.flatnonzero(counts)
         return pd.DataFrame({
-            LEFT_LAYER_COL_NAME: ["A", "B", "A"],
-            RIGHT_LAYER_COL_NAMES[0]: ["C", "D", "D"],
-            RIGHT_LAYER_COL_NAMES[1]: ["C", "D", "C"],
-            "count": [40, 2, 2]
+            left_layer: np.asarray(left_labels, dtype=object)[pairs // len(right_labels)],
+            right_layer: np.asarray(right_labels, dtype=object)[pairs % len(right_labels)],
+            "count": counts[pairs],
         })
 
+    def _flow_partitions(self, left_layer, right_layer):
+        """
+        Builds (once per layer pair) the flow index behind get_flow: for each
+        state, plus "All States", the enrollments sorted ascending and the
+        running (left, right) pair counts in that order.
+        Colleges with unknown enrollment count as 0.
+        """
+        key = (left_layer, right_layer)
+        if key not in self._flow_index:
+            df = self.college_data
+            left_codes, left_labels = _layer_codes(df[left_layer])
+            right_codes, right_labels = _layer_codes(df[right_layer])
+            n_pairs = len(left_labels) * len(right_labels)
+            pair = np.where((left_codes >= 0) & (right_codes >= 0),
+                            left_codes * len(right_labels) + right_codes, -1)
+            enrollment = df[ENROLLMENT_COL].fillna(0).to_numpy()
+
+            groups = {ALL_STATES: np.arange(len(df))}
+            groups.update(df.groupby(STATE_COL).indices)
+
+            partitions = {}
+            for state, rows in groups.items():
+                order = rows[np.argsort(enrollment[rows], kind="stable")]
+                counted = np.flatnonzero(pair[order] >= 0)
+                # row i + 1 of cumulative = pair counts over the first i + 1 colleges
+                cumulative = np.zeros((len(order) + 1, n_pairs), dtype=np.int32)
+                cumulative[counted + 1, pair[order][counted]] = 1
+                partitions[state] = (enrollment[order], cumulative.cumsum(axis=0))
+            self._flow_index[key] = (left_labels, right_labels, partitions)
+        return self._flow_index[key]
+
 def main():
     api = CollegeAPI(DATA_FILE_PATH)
     api.process_data()
@@ -0,0 +1,86 @@
+"""
+Callback Scheduler
+Sits between the UI widgets and the expensive callbacks (get_flow + make_sankey).
+- Debounce: a burst of widget events (e.g. dragging the enrollment slider)
+  is coalesced into one request, sent once the widgets are quiet for `delay` seconds.
+- Latest wins: every new request makes all older ones stale. Stale requests
+  that have not started yet are cancelled; ones already running finish in
+  the background but their results are thrown away.
+- The work runs on a small thread pool so the UI stays responsive.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_DELAY = 0.15   # seconds of quiet before a request is sent
+
+logger = logging.getLogger(__name__)
+
+
+class CallbackScheduler:
+    def __init__(self, func, on_result, delay=DEFAULT_DELAY, max_workers=2, on_error=None):
+        """
+        func: the expensive callback, called with the latest submitted args.
+        on_result: called with func's return value, only if it is still the latest request.
+        delay: debounce window in seconds.
+        on_error: called with the exception if func fails (default: log it with its traceback;
+                  nothing waits on the worker's future, so a re-raise would be lost).
+        """
+        self.func = func
+        self.on_result = on_result
+        self.on_error = on_error
+        self.delay = delay
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.submitted = 0     # widget events seen
+        self.completed = 0     # results handed to on_result
+        self._generation = 0
+        self._timer = None
+        self._future = None
+        self._lock = threading.RLock()
+
+    def submit(self, *args, **kwargs):
+        """Schedule func(*args, **kwargs), replacing any request not yet delivered."""
+        with self._lock:
+            self._generation += 1
+            self.submitted += 1
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self._launch, (self._generation, args, kwargs))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def is_stale(self, generation):
+        """True once a newer request has been submitted."""
+        return generation != self._generation
+
+    def _launch(self, generation, args, kwargs):
+        with self._lock:
+            if self.is_stale(generation):
+                return
+            if self._future is not None:
+                self._future.cancel()   # only succeeds if it has not started yet
+            self._future = self.executor.submit(self._run, generation, args, kwargs)
+
+    def _run(self, generation, args, kwargs):
+        if self.is_stale(generation):
+            return
+        try:
+            result = self.func(*args, **kwargs)
+        except Exception as e:
+            if self.on_error is None:
+                logger.exception("Scheduled callback %s failed", getattr(self.func, "__name__", self.func))
+            else:
+                self.on_error(e)
+            return
+        # deliver under the lock so an older result can never land after a newer one
+        with self._lock:
+            if self.is_stale(generation):
+                return
+            self.completed += 1
+            self.on_result(result)
+
+    def shutdown(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
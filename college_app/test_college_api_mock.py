@@ -0,0 +1,70 @@
+import os
+import pandas as pd
+import pytest
+import college_api_mock as mock
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture
+def scorecard_csv(tmp_path):
+    """The first 400 colleges of the real scorecard, copied so cache files land in tmp_path."""
+    path = tmp_path / "scorecard.csv"
+    pd.read_csv(os.path.join(HERE, mock.DATA_FILE_PATH)).head(400).to_csv(path, index=False)
+    return str(path)
+
+
+def test_process_data_cache_round_trip(scorecard_csv):
+    """A cache hit returns the same frame as processing from scratch; stale entries are removed"""
+    fresh = mock.CollegeAPI(scorecard_csv)
+    fresh.process_data()
+    cached = mock.CollegeAPI(scorecard_csv)
+    cached.college_data = None      # a hit must not depend on the raw frame
+    cached.process_data()
+    pd.testing.assert_frame_equal(cached.college_data, fresh.college_data)
+    first_entry = [f for f in os.listdir(os.path.dirname(scorecard_csv)) if f.endswith(".processed.pkl")]
+    assert len(first_entry) == 1
+
+    # new CSV contents: new entry, the old one is deleted
+    pd.read_csv(scorecard_csv).head(200).to_csv(scorecard_csv, index=False)
+    changed = mock.CollegeAPI(scorecard_csv)
+    changed.process_data()
+    entries = [f for f in os.listdir(os.path.dirname(scorecard_csv)) if f.endswith(".processed.pkl")]
+    assert len(entries) == 1 and entries != first_entry
+    assert len(changed.college_data) < len(fresh.college_data)
+
+
+@pytest.fixture
+def college_api(scorecard_csv):
+    """Processed API over the small scorecard, with a few unknown enrollments."""
+    df = pd.read_csv(scorecard_csv)
+    df.loc[df.index[::37], mock.ENROLLMENT_COL] = None
+    df.to_csv(scorecard_csv, index=False)
+    api = mock.CollegeAPI(scorecard_csv)
+    api.process_data()
+    return api
+
+
+def groupby_flow(api, state, left, right, min_enrollment):
+    """Reference: count (left, right) pairs over get_subset."""
+    counts = api.get_subset(state, min_enrollment).groupby([left, right], observed=True).size()
+    return {pair: n for pair, n in counts.items() if n > 0}
+
+
+@pytest.mark.parametrize("right", mock.RIGHT_LAYER_COL_NAMES)
+def test_get_flow_matches_groupby(college_api, right):
+    """The cumulative-count flow index gives the same counts as grouping the filtered subset"""
+    data = college_api.college_data
+    states = [mock.ALL_STATES] + data[mock.STATE_COL].value_counts().index[:4].tolist() + ["XX"]
+    for state in states:
+        rows = data if state == mock.ALL_STATES else data[data[mock.STATE_COL] == state]
+        enrollments = rows[mock.ENROLLMENT_COL].dropna().unique()
+        # thresholds on, just below and just above real enrollments, plus both extremes
+        thresholds = {0, 1, int(data[mock.ENROLLMENT_COL].max()) + 1}
+        for e in sorted(enrollments)[::max(1, len(enrollments) // 6)]:
+            thresholds |= {e - 1, e, e + 0.5}
+        for min_enrollment in sorted(thresholds):
+            flow = college_api.get_flow(state, mock.LEFT_LAYER_COL_NAME, right, min_enrollment)
+            got = {(l, r): n for l, r, n in flow.itertuples(index=False)}
+            assert got == groupby_flow(college_api, state, mock.LEFT_LAYER_COL_NAME, right, min_enrollment), \
+                (state, min_enrollment)
@@ -0,0 +1,66 @@
+import threading
+import time
+from scheduler import CallbackScheduler
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+def test_burst_is_debounced_to_last_call():
+    """A burst of submits runs func once, with the last call's arguments"""
+    calls, results = [], []
+    scheduler = CallbackScheduler(lambda x: calls.append(x) or x * 10, results.append, delay=0.05)
+    try:
+        for x in range(20):
+            scheduler.submit(x)
+        assert wait_for(lambda: results)
+        time.sleep(0.1)
+        assert calls == [19]
+        assert results == [190]
+        assert (scheduler.submitted, scheduler.completed) == (20, 1)
+    finally:
+        scheduler.shutdown()
+
+
+def test_running_request_result_is_dropped_when_superseded():
+    """A request already running when a newer one arrives finishes, but only the newer result is delivered"""
+    started, release = threading.Event(), threading.Event()
+    results = []
+
+    def func(x):
+        if x == "old":
+            started.set()
+            release.wait(2)
+        return x
+
+    scheduler = CallbackScheduler(func, results.append, delay=0.01)
+    try:
+        scheduler.submit("old")
+        assert started.wait(2)
+        scheduler.submit("new")
+        assert wait_for(lambda: results)
+        release.set()
+        time.sleep(0.05)
+        assert results == ["new"]
+    finally:
+        release.set()
+        scheduler.shutdown()
+
+
+def test_failure_is_logged_without_on_error(caplog):
+    """With no on_error, a failing callback is logged instead of vanishing in the worker"""
+    def func():
+        raise ValueError("boom")
+
+    scheduler = CallbackScheduler(func, lambda r: None, delay=0.01)
+    try:
+        scheduler.submit()
+        assert wait_for(lambda: caplog.records)
+        assert "func failed" in caplog.records[0].getMessage()
+        assert caplog.records[0].exc_info[0] is ValueError
+    finally:
+        scheduler.shutdown()
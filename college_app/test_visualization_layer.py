@@ -0,0 +1,27 @@
+import pandas as pd
+import Visualization_layer as sk
+
+
+def test_label_shared_by_two_stages_gives_two_nodes():
+    """'Unspecified' in two stages is two nodes, so no link loops back on itself"""
+    df = pd.DataFrame({
+        "admission": ["Selective", "Selective", "Open Access", "Selective"],
+        "completion": ["Unspecified", "High", "Unspecified", "Unspecified"],
+        "earnings": ["Unspecified", "High", "Low", "Unspecified"],
+    })
+    links, labels = sk._stage_links(df, ["admission", "completion", "earnings"])
+
+    assert list(labels) == [(0, "Selective"), (0, "Open Access"), (1, "Unspecified"), (1, "High"),
+                            (2, "Unspecified"), (2, "High"), (2, "Low")]
+    assert not (links["source"] == links["target"]).any()
+    flows = {(list(labels)[s], list(labels)[t]): v for s, t, v in links.itertuples(index=False)}
+    assert flows[(1, "Unspecified"), (2, "Unspecified")] == 2
+    assert flows[(1, "Unspecified"), (2, "Low")] == 1
+
+    fig = sk.make_sankey(df, ["admission", "completion", "earnings"])
+    assert list(fig.data[0].node.label) == ["Selective", "Open Access", "Unspecified", "High",
+                                            "Unspecified", "High", "Low"]
+
+    # a previous node order is kept, new nodes are appended
+    _, again = sk._stage_links(df.iloc[::-1], ["admission", "completion", "earnings"], labels=labels)
+    assert again == labels
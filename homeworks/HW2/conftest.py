@@ -0,0 +1,6 @@
+import os
+import sys
+
+# the tests check stage records and the response cache, so load the shared
+# modules (shared/instrument.py, shared/http_cache.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "shared"))
@@ -1,44 +1,123 @@
-import matplotlib
-matplotlib.use('TkAgg')
 import requests
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+from pandas.tseries.api import guess_datetime_format
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from render import render_figures
+# the on-disk response cache is shared with code/ (shared/http_cache.py) and optional
+try:
+    from http_cache import ResponseCache
+except ImportError:   # shared/ is not on the path: requests go out uncached
+    ResponseCache = None
+# stage instrumentation is shared by every project (shared/instrument.py) and optional
+try:
+    from instrument import instrument
+except ImportError:   # shared/ is not on the path: stages run uninstrumented
+    def instrument(name=None):
+        return lambda func: func
 
 #1 Data Acquisition
-def fetch_gbif_data(species_list, year):
+GBIF_URL = "https://api.gbif.org/v1/occurrence/search"
+GBIF_PAGE_SIZE = 300        # largest page the occurrence search API serves
+GBIF_MAX_OFFSET = 100000    # the API refuses offset + limit beyond this
+MAX_WORKERS = 8             # concurrent requests to the API
+
+# re-runs with the same query are answered from disk (see shared/http_cache.py)
+HTTP_CACHE = ResponseCache() if ResponseCache is not None else None
+
+
+def _fetch_page(session, cache, base_url, params, offset, limit):
+    """Fetch one page of occurrence search results (through cache unless it is None)."""
+    params = {**params, 'offset': offset, 'limit': limit}
+    if cache is None:
+        response = session.get(base_url, params=params, timeout=30)
+    else:
+        response = cache.get(base_url, params=params, session=session, timeout=30)
+    response.raise_for_status()
+    return response.json()
+
+
+@instrument()
+def fetch_gbif_data(species_list, year, base_url=GBIF_URL, page_size=GBIF_PAGE_SIZE,
+                    max_workers=MAX_WORKERS, max_records=GBIF_MAX_OFFSET, cache=None):
     """
     Parameters:
     species_list: list of scientific names
     year: int
+    base_url: occurrence search endpoint
+    page_size: records requested per page
+    max_workers: cap on concurrent requests
+    max_records: cap on records fetched per species
+    cache: ResponseCache for the pages (default HTTP_CACHE, None when shared/ is not on the path)
+
+    Pages through every species' results (offset / endOfRecords) in parallel
+    over one pooled HTTP session. The first page of each species reports the
+    total count, so all remaining pages are requested at once.
 
     Return:
     pd.DataFrame with species name, coordinates, date, state,
     and coordinate uncertainty
     """
-    base_url = "https://api.gbif.org/v1/occurrence/search"
-    all_records = []
+    if cache is None:
+        cache = HTTP_CACHE
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    pages = {species: {} for species in species_list}   # species -> {offset: results}
+    failed = set()
+    pending = {}   # future -> (species, offset)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        def submit(species, offset, limit=page_size):
+            params = {
+                'scientificName': species,
+                'year': year,
+                'decimalLatitude': '38.8,47.5',
+                'decimalLongitude': '-77.5,-66.5',
+                'hasCoordinate': True}
+            limit = min(limit, max_records - offset)
+            future = pool.submit(_fetch_page, session, cache, base_url, params, offset, limit)
+            pending[future] = (species, offset)
+
+        for species in species_list:
+            print(f"Fetching data for {species}")
+            submit(species, 0)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                species, offset = pending.pop(future)
+                try:
+                    data = future.result()
+                except Exception as e:
+                    print(f"  Exception for {species} at offset {offset}: {e}")
+                    failed.add(species)
+                    continue
+                results = data.get('results', [])
+                pages[species][offset] = results
+
+                next_offset = offset + len(results)
+                if data.get('endOfRecords', True) or not results or next_offset >= max_records:
+                    continue
+                if offset == 0 and 'count' in data:
+                    # total is known: request every remaining page concurrently
+                    total = min(data['count'], max_records)
+                    for start in range(next_offset, total, len(results)):
+                        submit(species, start, len(results))
+                elif 'count' not in data:
+                    # no total reported: walk forward one page at a time
+                    submit(species, next_offset)
+
+    session.close()
 
+    all_records = []
     for species in species_list:
-        print(f"Fetching data for {species}")
-        params = {
-            'scientificName': species,
-            'year': year,
-            'decimalLatitude': '38.8,47.5',
-            'decimalLongitude': '-77.5,-66.5',
-            'hasCoordinate': True,
-            'limit': 100}
-        try:
-            response = requests.get(base_url, params=params, timeout=30)
-            if response.status_code == 200:
-                data = response.json()
-                results = data.get('results', [])
-                all_records.extend(results)
-                print(f"  Retrieved {len(results)} observations for {species}")
-            else:
-                print(f"  Error {response.status_code} for {species}")
-        except Exception as e:
-            print(f"  Exception for {species}: {e}")
+        species_records = [r for offset in sorted(pages[species]) for r in pages[species][offset]]
+        all_records.extend(species_records)
+        status = " (incomplete)" if species in failed else ""
+        print(f"  Retrieved {len(species_records)} observations for {species}{status}")
 
     if not all_records:
         print("No records retrieved!")
@@ -58,6 +137,7 @@ def fetch_gbif_data(species_list, year):
 
 
 # 2 Data Cleaning & Metrics
+@instrument()
 def clean_biodiversity_data(raw_df):
     """
     Clean biodiversity data by removing invalid/missing data, duplicates,
@@ -108,7 +188,135 @@ def clean_biodiversity_data(raw_df):
         'percent_retained': round(percent_retained, 2)}
     return df, metrics
 
+CHUNK_SIZE = 100000    # rows per chunk for clean_biodiversity_data_chunked
+
+
+NULL_HASH = np.uint64(0x9E3779B97F4A7C15)   # fingerprint of a missing value, whatever the dtype
+
+
+def _row_fingerprints(df):
+    """
+    64-bit hash of every row's values (the index is ignored).
+    Each column is hashed on its own and missing values all get NULL_HASH,
+    so a text column read as all-NaN float64 in one chunk and as str in
+    another still gives the same fingerprint. Numeric columns are hashed
+    as float64, so one read as int in one chunk and float in another does too.
+    """
+    fingerprints = np.zeros(len(df), dtype=np.uint64)
+    for col in df.columns:
+        values = df[col]
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            values = values.astype('float64') + 0.0   # + 0.0 folds -0.0 into 0.0
+        hashed = pd.util.hash_pandas_object(values, index=False).to_numpy(copy=True)
+        hashed[values.isna().to_numpy()] = NULL_HASH
+        fingerprints = fingerprints * np.uint64(1_000_003) ^ hashed
+    return fingerprints
+
+
+def _seen_before(fingerprints, seen):
+    """Boolean mask of fingerprints already in the sorted array seen."""
+    if len(seen) == 0:
+        return np.zeros(len(fingerprints), dtype=bool)
+    pos = np.searchsorted(seen, fingerprints).clip(max=len(seen) - 1)
+    return seen[pos] == fingerprints
+
+
+@instrument()
+def clean_biodiversity_data_chunked(chunks, output_path=None):
+    """
+    Streaming version of clean_biodiversity_data for raw data too big to
+    copy in memory, e.g. pd.read_csv(path, chunksize=CHUNK_SIZE).
+    Duplicates are caught across chunks with a sorted array of row
+    fingerprints (8 bytes per kept row). The rows kept, the metrics and the
+    parsed dates are the same as clean_biodiversity_data on the whole data.
+
+    Parameters:
+    chunks : iterable of pd.DataFrame, pieces of the raw data in order
+    output_path : optional CSV path; cleaned rows are appended to it chunk
+                  by chunk instead of being kept in memory
+
+    Returns:
+    tuple: (cleaned_df, metrics_dict)
+        - cleaned_df: as clean_biodiversity_data, or None if output_path is given
+        - metrics_dict: Dictionary with cleaning metrics
+    """
+    critical_columns = ['species_name', 'latitude', 'longitude', 'date']
+    initial_count = 0
+    removed_missing = 0
+    removed_duplicates = 0
+    removed_invalid_dates = 0
+    final_count = 0
+
+    seen = np.empty(0, dtype=np.uint64)
+    date_kwargs = None
+    template = None
+    parts = []
+
+    for chunk in chunks:
+        if template is None:
+            template = chunk.iloc[:0]
+        initial_count += len(chunk)
+
+        df = chunk.dropna(subset=critical_columns)
+        removed_missing += len(chunk) - len(df)
+
+        # drop rows repeated inside this chunk or seen in an earlier one
+        fingerprints = _row_fingerprints(df)
+        duplicate = pd.Series(fingerprints).duplicated().to_numpy() | _seen_before(fingerprints, seen)
+        df = df[~duplicate]
+        removed_duplicates += int(duplicate.sum())
+        # merge the (few) new fingerprints into seen in linear time instead of re-sorting it
+        new = np.sort(fingerprints[~duplicate])
+        seen = np.insert(seen, np.searchsorted(seen, new), new)
+
+        if len(df) == 0:
+            continue
+
+        # pandas infers the date format from the first date it sees; fix it
+        # from the first kept row so every chunk is parsed the same way
+        if date_kwargs is None:
+            first = df['date'].iloc[0]
+            date_format = guess_datetime_format(first) if isinstance(first, str) else None
+            date_kwargs = {'format': date_format or 'mixed'} if isinstance(first, str) else {}
+
+        before_dates = len(df)
+        df = df.assign(date=pd.to_datetime(df['date'], errors='coerce', **date_kwargs))
+        df = df.dropna(subset=['date'])
+        df = df.assign(month=df['date'].dt.month)
+        removed_invalid_dates += before_dates - len(df)
+        final_count += len(df)
+
+        if len(df) == 0:
+            continue
+        if output_path is not None:
+            df.to_csv(output_path, mode='a' if parts else 'w', header=not parts, index=False)
+            parts.append(None)
+        else:
+            parts.append(df)
+
+    if not parts:
+        # nothing survived: same empty frame the in-memory path returns
+        empty = clean_biodiversity_data(template if template is not None else pd.DataFrame(
+            columns=critical_columns))[0]
+        if output_path is not None:
+            empty.to_csv(output_path, index=False)
+        else:
+            parts.append(empty)
+
+    percent_retained = (final_count / initial_count) * 100 if initial_count > 0 else 0
+
+    metrics = {
+        'raw_count': initial_count,
+        'clean_count': final_count,
+        'removed_missing': removed_missing,
+        'removed_duplicates': removed_duplicates,
+        'removed_invalid_dates': removed_invalid_dates,
+        'percent_retained': round(percent_retained, 2)}
+    cleaned_df = None if output_path is not None else pd.concat(parts)
+    return cleaned_df, metrics
+
 # 3 Data Enrichment
+@instrument()
 def enrich_with_state_data(cleaned_df, state_ref_df):
     """
     Join bird observations with state reference data.
@@ -145,32 +353,280 @@ def enrich_with_state_data(cleaned_df, state_ref_df):
         print("\n✓ All states matched successfully!")
     return enriched_df
 
+STATE_BOUNDS_PATH = 'state_bounds.csv'   # bounding box + center of every state
+GRID_DEGREES = 1.0                       # cell size of the state grid index
+
+
+def build_state_index(bounds_df, cell_size=GRID_DEGREES):
+    """
+    Grid-bucketed bounding-box index over the states in bounds_df.
+    Each cell of a cell_size-degree lat/lon grid lists the states whose box
+    overlaps it, padded with -1 to a fixed width, so a whole column of
+    points is looked up with one array index.
+
+    Parameters:
+    bounds_df : pd.DataFrame with abbreviation, min_lat, max_lat, min_lon,
+                max_lon, center_lat and center_lon columns
+    cell_size : grid cell size in degrees
+
+    Returns:
+    dict of numpy arrays used by assign_states
+    """
+    bounds = {col: bounds_df[col].to_numpy(dtype=float) for col in
+              ['min_lat', 'max_lat', 'min_lon', 'max_lon', 'center_lat', 'center_lon']}
+    lat0, lon0 = bounds['min_lat'].min(), bounds['min_lon'].min()
+    n_rows = int((bounds['max_lat'].max() - lat0) // cell_size) + 1
+    n_cols = int((bounds['max_lon'].max() - lon0) // cell_size) + 1
+
+    # cell ranges covered by every state's box
+    r0 = ((bounds['min_lat'] - lat0) // cell_size).astype(int)
+    r1 = ((bounds['max_lat'] - lat0) // cell_size).astype(int)
+    c0 = ((bounds['min_lon'] - lon0) // cell_size).astype(int)
+    c1 = ((bounds['max_lon'] - lon0) // cell_size).astype(int)
+
+    buckets = [[] for _ in range(n_rows * n_cols)]
+    for state in range(len(bounds_df)):
+        for row in range(r0[state], r1[state] + 1):
+            for col in range(c0[state], c1[state] + 1):
+                buckets[row * n_cols + col].append(state)
+
+    cells = np.full((len(buckets), max(map(len, buckets))), -1)
+    for i, bucket in enumerate(buckets):
+        cells[i, :len(bucket)] = bucket
+
+    return {'cells': cells, 'origin': (lat0, lon0), 'shape': (n_rows, n_cols),
+            'cell_size': cell_size, 'abbreviation': bounds_df['abbreviation'].to_numpy(dtype=object),
+            **bounds}
+
+
+def assign_states(latitudes, longitudes, state_index):
+    """
+    Assign every (latitude, longitude) to a state in one vectorized pass.
+    Points are matched to the states whose bounding box contains them; where
+    boxes overlap (along borders) the state with the nearest center wins.
+    Boxes are coarse, so only use this where no state was reported.
+
+    Returns:
+    np.ndarray of state abbreviations, None where a point is in no state's
+    box (offshore, outside the US, or missing coordinates)
+    """
+    lat = np.asarray(latitudes, dtype=float)
+    lon = np.asarray(longitudes, dtype=float)
+    lat0, lon0 = state_index['origin']
+    n_rows, n_cols = state_index['shape']
+    cell_size = state_index['cell_size']
+
+    with np.errstate(invalid='ignore'):
+        row = np.floor((lat - lat0) / cell_size)
+        col = np.floor((lon - lon0) / cell_size)
+        on_grid = (row >= 0) & (row < n_rows) & (col >= 0) & (col < n_cols)
+    cell = np.where(on_grid, row * n_cols + col, 0).astype(int)
+
+    # (points x candidates) matrix of state ids from each point's cell
+    candidates = state_index['cells'][cell]
+    state = candidates.clip(min=0)
+    lat_, lon_ = lat[:, None], lon[:, None]
+    inside = ((candidates >= 0) & on_grid[:, None]
+              & (lat_ >= state_index['min_lat'][state]) & (lat_ <= state_index['max_lat'][state])
+              & (lon_ >= state_index['min_lon'][state]) & (lon_ <= state_index['max_lon'][state]))
+
+    # squared distance to each candidate's center, longitude shrunk by cos(latitude)
+    dlat = lat_ - state_index['center_lat'][state]
+    dlon = (lon_ - state_index['center_lon'][state]) * np.cos(np.radians(lat_))
+    distance = np.where(inside, dlat ** 2 + dlon ** 2, np.inf)
+
+    best = state[np.arange(len(lat)), distance.argmin(axis=1)]
+    return np.where(inside.any(axis=1), state_index['abbreviation'][best], None)
+
+
+@instrument()
+def enrich_with_state_coordinates(cleaned_df, state_ref_df, state_index=None):
+    """
+    enrich_with_state_data, with the state of rows whose state text is
+    missing filled in from their latitude/longitude. Reported text is never
+    overridden: state boxes overlap each other and neighbouring provinces,
+    so an Ontario or District of Columbia row keeps its own name.
+
+    Parameters:
+    cleaned_df : pd.DataFrame
+        - cleaned bird observations data
+    state_ref_df : pd.DataFrame
+        - state reference data with state names, abbreviations, regions, and land areas
+    state_index : optional index from build_state_index (default: built from STATE_BOUNDS_PATH)
+
+    Returns:
+    pd.DataFrame
+        -enriched data with region and area_sq_km columns added
+    """
+    if state_index is None:
+        state_index = build_state_index(pd.read_csv(STATE_BOUNDS_PATH))
+
+    reference = state_ref_df.assign(state_name=state_ref_df['state_name'].str.strip().str.title())
+    by_abbreviation = reference.set_index('abbreviation')
+    by_name = reference.set_index('state_name')
+
+    state = cleaned_df['state'].str.strip().str.title()
+    missing = state.isna() | (state == '')
+    abbreviations = assign_states(cleaned_df.loc[missing, 'latitude'],
+                                  cleaned_df.loc[missing, 'longitude'], state_index)
+    state[missing] = pd.Series(abbreviations, index=state.index[missing]).map(by_abbreviation['state_name'])
+
+    enriched_df = cleaned_df.copy()
+    enriched_df['state'] = state
+    enriched_df['region'] = state.map(by_name['region'])
+    enriched_df['area_sq_km'] = state.map(by_name['area_sq_km'])
+
+    located = state[missing].notna().sum()
+    unmatched_states = state[enriched_df['region'].isnull()].dropna().unique()
+    print(f"\n{located} of {missing.sum()} observations without a state located from coordinates.")
+    if len(unmatched_states) > 0:
+        print(f"Warning: {len(unmatched_states)} states didn't match:")
+        for name in unmatched_states:
+            print(f"  - {name}")
+        print("These observations will have null region and area_sq_km values.")
+    return enriched_df
+
 # 4 Analysis
-def calculate_analysis(enriched_df):
+MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+               'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+
+@instrument()
+def aggregate_observations(enriched_df):
+    """
+    Compute every count, density and the date range used by the report and
+    analysis_output.json in one scan over categorical codes.
+    State, species and month are factorized once and counted together with a
+    single bincount; every table below is a sum over that small
+    (state x species x month) cube instead of another groupby over the rows.
+
+    Parameters:
+    enriched_df : pd.DataFrame
+        - enriched data with region and area_sq_km columns
+
+    Returns:
+    dict with
+        - by_state: observations per state (Series, sorted by state)
+        - density: observations, area_sq_km and density per 1000 sq km for
+          states with a known area (DataFrame, sorted by density)
+        - by_region, by_month, by_species: observation counts (Series)
+        - species_month: count per (month, species_name) pair (DataFrame)
+        - total_observations, states_covered, date_range (earliest, latest)
+    """
+    state_codes, states = pd.factorize(enriched_df['state'], sort=True)
+    species_codes, species = pd.factorize(enriched_df['species_name'], sort=True)
+    month_codes, months = pd.factorize(enriched_df['month'], sort=True)
+
+    # shift codes by one so missing values (code -1) get their own slot 0
+    shape = (len(states) + 1, len(species) + 1, len(months) + 1)
+    combined = np.ravel_multi_index((state_codes + 1, species_codes + 1, month_codes + 1), shape)
+    cube = np.bincount(combined, minlength=int(np.prod(shape))).reshape(shape)
+
+    by_state = pd.Series(cube[1:].sum(axis=(1, 2)), index=states)
+    by_species = pd.Series(cube[:, 1:].sum(axis=(0, 2)), index=species)
+    by_month = pd.Series(cube[:, :, 1:].sum(axis=(0, 1)), index=months)
+
+    month_species = cube[:, 1:, 1:].sum(axis=0).T   # (month x species)
+    month_idx, species_idx = np.nonzero(month_species)
+    species_month = pd.DataFrame({'month': months[month_idx],
+                                  'species_name': species[species_idx],
+                                  'count': month_species[month_idx, species_idx]})
+
+    # region and area depend only on the state: read them off each state's first row
+    rows = np.arange(len(enriched_df))
+    located = state_codes >= 0
+    first_row = np.full(len(states), len(enriched_df))
+    np.minimum.at(first_row, state_codes[located], rows[located])
+    region_of_state = enriched_df['region'].to_numpy()[first_row]
+    area_of_state = enriched_df['area_sq_km'].to_numpy(dtype=float)[first_row]
+
+    # regions in order of first appearance, then by count (as value_counts does)
+    order = np.argsort(first_row, kind='stable')
+    by_region = (pd.Series(by_state.to_numpy()[order], index=region_of_state[order])
+                 .groupby(level=0, sort=False).sum()
+                 .sort_values(ascending=False, kind='stable'))
+
+    # density counts observations with a species name, like the report always has
+    known_area = ~np.isnan(area_of_state)
+    named = cube[1:, 1:].sum(axis=(1, 2))
+    density = pd.DataFrame({'observations': named[known_area],
+                            'area_sq_km': area_of_state[known_area]},
+                           index=states[known_area])
+    density['density'] = (density['observations'] / density['area_sq_km']) * 1000
+    density = density.sort_values('density', ascending=False)
+
+    dates = enriched_df['date']
+    return {
+        'by_state': by_state,
+        'density': density,
+        'by_region': by_region,
+        'by_month': by_month,
+        'by_species': by_species,
+        'species_month': species_month,
+        'total_observations': len(enriched_df),
+        'states_covered': int((by_state > 0).sum()),
+        'date_range': (dates.min(), dates.max())}
+
+
+def analysis_output(analysis):
+    """
+    Build the analysis_output.json deliverable from aggregate_observations.
+    """
+    earliest, latest = analysis['date_range']
+    return {
+        "observations_by_state": analysis['by_state'].to_dict(),
+        "observations_by_region": analysis['by_region'].to_dict(),
+        "observations_by_month": analysis['by_month'].to_dict(),
+        "observations_by_species": analysis['by_species'].to_dict(),
+        "total_observations": analysis['total_observations'],
+        "states_covered": analysis['states_covered'],
+        "date_range": {
+            "earliest": earliest.strftime('%Y-%m-%d'),
+            "latest": latest.strftime('%Y-%m-%d')
+        }
+    }
+
+
+def species_distribution_spec(species_month, path='species_dist.png'):
+    """
+    Plot spec (see render.py) for the species-per-month bar chart.
+    """
+    months = sorted(species_month['month'].unique())
+    return {
+        'kind': 'barplot',
+        'path': path,
+        'data': species_month,
+        'x': 'month',
+        'y': 'count',
+        'hue': 'species_name',
+        'xlabel': 'Month',
+        'ylabel': 'Number of Observations',
+        'title': 'Species Distribution Across Months',
+        'legend_title': 'Species',
+        'xticklabels': [MONTH_NAMES[month - 1] for month in months],
+        'dpi': 300}
+
+
+def calculate_analysis(enriched_df, analysis=None):
     """
     Perform analysis on enriched bird observation data.
 
     Parameters:
     enriched_df : pd.DataFrame
         - enriched data with region and area_sq_km columns
+    analysis : optional result of aggregate_observations(enriched_df)
 
     Returns:
-    None (displays analysis results and plots)
+    dict, the aggregate_observations result (also prints the report and saves species_dist.png)
     """
+    if analysis is None:
+        analysis = aggregate_observations(enriched_df)
+
     print("\n" + "=" * 60)
     print("ANALYSIS: Observations per State with Density")
     print("=" * 60)
 
-    state_data = enriched_df[enriched_df['area_sq_km'].notna()].copy()
-
-    obs_per_state = state_data.groupby('state').agg({
-        'species_name': 'count',
-        'area_sq_km': 'first'
-    }).rename(columns={'species_name': 'observations'})
-
-    obs_per_state['density'] = (obs_per_state['observations'] / obs_per_state['area_sq_km']) * 1000
-
-    obs_per_state = obs_per_state.sort_values('density', ascending=False)
+    obs_per_state = analysis['density']
 
     print("\nObservations per State (sorted by density):")
     print(f"{'State':<20} {'Observations':<15} {'Area (sq km)':<15} {'Density*':<15}")
@@ -185,35 +641,22 @@ def calculate_analysis(enriched_df):
     print("ANALYSIS: Species Distribution Across Months")
     print("=" * 60)
 
-    species_month = enriched_df.groupby(['month', 'species_name']).size().reset_index(name='count')
-
-    plt.figure(figsize=(12, 6))
-
-    sns.barplot(data=species_month, x='month', y='count', hue='species_name', palette='Set2')
-
-    plt.xlabel('Month', fontsize=12)
-    plt.ylabel('Number of Observations', fontsize=12)
-    plt.title('Species Distribution Across Months', fontsize=14, fontweight='bold')
-    plt.legend(title='Species', bbox_to_anchor=(1.05, 1), loc='upper left')
-    plt.xticks(range(12), ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
-                           'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'])
-    plt.tight_layout()
-    plt.savefig('species_dist.png', dpi=300, bbox_inches='tight')
-    print("\n✓ Plot saved as 'species_dist.png'")
-    plt.show()
+    status = render_figures([species_distribution_spec(analysis['species_month'])])
+    if status['species_dist.png'] == 'rendered':
+        print("\n✓ Plot saved as 'species_dist.png'")
+    else:
+        print("\n✓ 'species_dist.png' is up to date")
 
     print("\nObservations by Month:")
-    monthly_totals = enriched_df.groupby('month').size().sort_index()
-    for month, count in monthly_totals.items():
-        month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
-                       'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-        print(f"  {month_names[month - 1]}: {count} observations")
+    for month, count in analysis['by_month'].items():
+        print(f"  {MONTH_NAMES[month - 1]}: {count} observations")
 
     print("\nObservations by Species:")
-    species_totals = enriched_df.groupby('species_name').size()
-    for species, count in species_totals.items():
+    for species, count in analysis['by_species'].items():
         print(f"  {species}: {count} observations")
 
+    return analysis
+
 
 # ============================================
 # MAIN EXECUTION
@@ -243,29 +686,18 @@ if __name__ == "__main__":
 
     # Step 4: Analysis
     print("\nStep 4: Performing analysis...")
-    calculate_analysis(enriched_data)
+    analysis = calculate_analysis(enriched_data)
 
     # Generate Deliverable Files
     print("\n" + "=" * 60)
     print("GENERATING DELIVERABLE FILES")
     print("=" * 60)
 
-    # 1. analysis_output.json
-    analysis_output = {
-        "observations_by_state": enriched_data.groupby('state').size().to_dict(),
-        "observations_by_region": enriched_data['region'].value_counts().to_dict(),
-        "observations_by_month": enriched_data.groupby('month').size().to_dict(),
-        "observations_by_species": enriched_data.groupby('species_name').size().to_dict(),
-        "total_observations": len(enriched_data),
-        "states_covered": enriched_data['state'].nunique(),
-        "date_range": {
-            "earliest": enriched_data['date'].min().strftime('%Y-%m-%d'),
-            "latest": enriched_data['date'].max().strftime('%Y-%m-%d')
-        }
-    }
+    # 1. analysis_output.json (same aggregation as the printed report)
+    output = analysis_output(analysis)
 
     with open('analysis_output.json', 'w') as f:
-        json.dump(analysis_output, f, indent=2)
+        json.dump(output, f, indent=2)
     print("✓ Saved analysis_output.json")
 
     # 2. quality_metrics.json
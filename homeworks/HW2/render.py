@@ -0,0 +1,111 @@
+"""
+Headless figure rendering
+Figures are described by plain plot specs (dicts) instead of being drawn
+inline, so they can be rendered off the main process:
+- Agg backend: no display needed, works on servers and in batch runs.
+- Parallel: several specs are rendered at once in a process pool.
+- Skip unchanged: each spec's content hash (data + options) is stored in a
+  manifest; a figure whose hash matches and whose file exists is not redrawn.
+
+A spec looks like
+    {'kind': 'barplot', 'path': 'species_dist.png', 'data': df,
+     'x': 'month', 'y': 'count', 'hue': 'species_name', ...}
+"""
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import pandas as pd
+import seaborn as sns
+
+MANIFEST_PATH = 'render_manifest.json'   # path -> content hash of the last render
+DEFAULT_DPI = 300
+
+
+def _barplot(spec):
+    """Seaborn barplot with optional labels, tick names and legend title."""
+    fig, ax = plt.subplots(figsize=spec.get('figsize', (12, 6)))
+    sns.barplot(data=spec['data'], x=spec['x'], y=spec['y'], hue=spec.get('hue'),
+                palette=spec.get('palette', 'Set2'), ax=ax)
+    ax.set_xlabel(spec.get('xlabel', spec['x']), fontsize=12)
+    ax.set_ylabel(spec.get('ylabel', spec['y']), fontsize=12)
+    ax.set_title(spec.get('title', ''), fontsize=14, fontweight='bold')
+    if 'xticklabels' in spec:
+        ax.set_xticks(range(len(spec['xticklabels'])), spec['xticklabels'])
+    if spec.get('hue') is not None:
+        ax.legend(title=spec.get('legend_title'), bbox_to_anchor=(1.05, 1), loc='upper left')
+    return fig
+
+
+# plot kind -> function(spec) returning a matplotlib Figure
+RENDERERS = {'barplot': _barplot}
+
+
+def spec_hash(spec):
+    """Content hash of a spec: its data values plus every other option."""
+    digest = hashlib.sha256()
+    for key in sorted(spec):
+        value = spec[key]
+        digest.update(key.encode())
+        if isinstance(value, pd.DataFrame):
+            digest.update(json.dumps(list(map(str, value.columns))).encode())
+            digest.update(pd.util.hash_pandas_object(value, index=False).to_numpy().tobytes())
+        else:
+            digest.update(json.dumps(value, default=str).encode())
+    return digest.hexdigest()
+
+
+def render_spec(spec):
+    """Draw one spec and save it to spec['path']. Returns the path."""
+    fig = RENDERERS[spec['kind']](spec)
+    fig.tight_layout()
+    fig.savefig(spec['path'], dpi=spec.get('dpi', DEFAULT_DPI), bbox_inches='tight')
+    plt.close(fig)
+    return spec['path']
+
+
+def _load_manifest(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def render_figures(specs, max_workers=None, manifest_path=MANIFEST_PATH, force=False):
+    """
+    Render every spec whose content changed since its last render.
+
+    Parameters:
+    specs : list of plot spec dicts (each with 'kind' and 'path')
+    max_workers : processes to render with (default: one per stale figure, up to the CPU count)
+    manifest_path : JSON file keeping the content hash of every rendered figure
+    force : re-render even if nothing changed
+
+    Returns:
+    dict: path -> 'rendered' or 'skipped'
+    """
+    manifest = _load_manifest(manifest_path)
+    hashes = {spec['path']: spec_hash(spec) for spec in specs}
+    stale = [spec for spec in specs
+             if force or manifest.get(spec['path']) != hashes[spec['path']]
+             or not os.path.exists(spec['path'])]
+
+    if len(stale) == 1:
+        render_spec(stale[0])   # not worth starting a pool for
+    elif stale:
+        workers = min(len(stale), max_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(render_spec, stale))
+
+    # record hashes only after the files were written
+    for spec in stale:
+        manifest[spec['path']] = hashes[spec['path']]
+    if stale:
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+    rendered = {spec['path'] for spec in stale}
+    return {spec['path']: 'rendered' if spec['path'] in rendered else 'skipped' for spec in specs}
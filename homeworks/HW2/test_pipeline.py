@@ -1,12 +1,24 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
 import pandas as pd
-from pipeline import fetch_gbif_data, clean_biodiversity_data, enrich_with_state_data
+import pytest
+from render import render_figures
+from http_cache import ResponseCache   # shared/http_cache.py, put on sys.path by conftest.py
+from pipeline import (fetch_gbif_data, clean_biodiversity_data, clean_biodiversity_data_chunked,
+                      enrich_with_state_data, enrich_with_state_coordinates,
+                      build_state_index, assign_states, STATE_BOUNDS_PATH,
+                      aggregate_observations, analysis_output)
+from instrument import enable, disable, JSONLinesSink   # shared/instrument.py, via conftest.py
 
-def test_fetch_gbif_data():
+def test_fetch_gbif_data(http_cache):
     """Test that fetch_gbif_data returns a DataFrame with required columns"""
     species_list = ['Sturnus vulgaris']
     year = 2023
 
-    result = fetch_gbif_data(species_list, year)
+    result = fetch_gbif_data(species_list, year, cache=http_cache)
 
     assert isinstance(result, pd.DataFrame), "Should return a DataFrame"
 
@@ -19,6 +31,176 @@ def test_fetch_gbif_data():
     print("✓ test_fetch_gbif_data passed")
 
 
+@pytest.fixture
+def gbif_stub():
+    """Local stand-in for the GBIF occurrence search API.
+    Serves a fixed number of records per species, honouring offset/limit,
+    and records how many requests were in flight at once."""
+    records = {'Bird A': 23, 'Bird B': 7, 'Bird C': 0}
+    stats = {'active': 0, 'max_active': 0, 'requests': 0, 'not_modified': 0, 'report_count': True}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with lock:
+                stats['active'] += 1
+                stats['requests'] += 1
+                stats['max_active'] = max(stats['max_active'], stats['active'])
+            query = parse_qs(urlparse(self.path).query)
+            species = query['scientificName'][0]
+            offset, limit = int(query['offset'][0]), int(query['limit'][0])
+            total = records.get(species, 0)
+            results = [{
+                'scientificName': species,
+                'decimalLatitude': 40.0 + i / 100,
+                'decimalLongitude': -70.0,
+                'eventDate': '2023-05-01',
+                'stateProvince': 'Maine',
+                'coordinateUncertaintyInMeters': i,
+            } for i in range(offset, min(offset + limit, total))]
+            body = {'offset': offset, 'limit': limit, 'results': results,
+                    'endOfRecords': offset + limit >= total}
+            if stats['report_count']:
+                body['count'] = total
+            payload = json.dumps(body).encode()
+            etag = f'"{species}-{offset}-{limit}-{total}"'
+            if self.headers.get('If-None-Match') == etag:
+                stats['not_modified'] += 1
+                self.send_response(304)
+                self.end_headers()
+                with lock:
+                    stats['active'] -= 1
+                return
+            self.send_response(200)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            with lock:
+                stats['active'] -= 1
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1/occurrence/search", stats
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def http_cache(tmp_path):
+    """Empty on-disk response cache, private to one test"""
+    return ResponseCache(tmp_path / 'http_cache.sqlite')
+
+
+def test_fetch_gbif_data_pages_every_species(gbif_stub, http_cache):
+    """All pages of every species are fetched, in order, without duplicates"""
+    url, stats = gbif_stub
+    result = fetch_gbif_data(['Bird A', 'Bird B', 'Bird C'], 2023, base_url=url,
+                             page_size=5, max_workers=3, cache=http_cache)
+
+    assert result['species_name'].value_counts().to_dict() == {'Bird A': 23, 'Bird B': 7}
+    assert result[result['species_name'] == 'Bird A']['coordinate_uncertainty'].tolist() == list(range(23))
+    assert stats['max_active'] <= 3, "Should respect the concurrency cap"
+
+    print("✓ test_fetch_gbif_data_pages_every_species passed")
+
+
+def test_fetch_gbif_data_follows_end_of_records(gbif_stub, http_cache):
+    """Without a total count, pages are followed until endOfRecords"""
+    url, stats = gbif_stub
+    stats['report_count'] = False
+    result = fetch_gbif_data(['Bird A'], 2023, base_url=url, page_size=10, cache=http_cache)
+
+    assert len(result) == 23
+    assert stats['requests'] == 3
+
+    print("✓ test_fetch_gbif_data_follows_end_of_records passed")
+
+
+def test_fetch_gbif_data_respects_max_records(gbif_stub, http_cache):
+    """max_records caps how many records are pulled per species"""
+    url, _ = gbif_stub
+    result = fetch_gbif_data(['Bird A', 'Bird B'], 2023, base_url=url, page_size=5,
+                             max_records=12, cache=http_cache)
+
+    assert result['species_name'].value_counts().to_dict() == {'Bird A': 12, 'Bird B': 7}
+
+    print("✓ test_fetch_gbif_data_respects_max_records passed")
+
+
+def test_fetch_gbif_data_reruns_from_cache(gbif_stub, http_cache):
+    """An identical second run is served from disk without any request"""
+    url, stats = gbif_stub
+    first = fetch_gbif_data(['Bird A', 'Bird B'], 2023, base_url=url, page_size=5, cache=http_cache)
+    requests_made = stats['requests']
+    second = fetch_gbif_data(['Bird A', 'Bird B'], 2023, base_url=url, page_size=5, cache=http_cache)
+
+    assert stats['requests'] == requests_made, "Second run should not hit the API"
+    pd.testing.assert_frame_equal(first, second)
+
+    print("✓ test_fetch_gbif_data_reruns_from_cache passed")
+
+
+def test_http_cache_revalidates_expired_entries(gbif_stub, tmp_path):
+    """Expired entries are revalidated with their ETag; a 304 keeps the cached body"""
+    url, stats = gbif_stub
+    cache = ResponseCache(tmp_path / 'http_cache.sqlite', ttl=0)
+    params = {'scientificName': 'Bird B', 'offset': 0, 'limit': 5}
+    first = cache.get(url, params=params)
+    second = cache.get(url, params=params)
+
+    assert stats['not_modified'] == 1
+    assert second.from_cache and second.json() == first.json()
+
+    print("✓ test_http_cache_revalidates_expired_entries passed")
+
+
+def test_http_cache_evicts_least_recently_used(gbif_stub, tmp_path):
+    """The cache never grows past max_bytes; the oldest entries go first"""
+    url, _ = gbif_stub
+    cache = ResponseCache(tmp_path / 'http_cache.sqlite', max_bytes=1500)
+    for offset in range(0, 20, 5):
+        cache.get(url, params={'scientificName': 'Bird A', 'offset': offset, 'limit': 5})
+
+    stats = cache.stats()
+    assert 0 < stats['bytes'] <= 1500
+    assert stats['entries'] < 4
+
+    print("✓ test_http_cache_evicts_least_recently_used passed")
+
+
+def test_http_cache_counts_every_threaded_call(gbif_stub, http_cache):
+    """Counters stay exact when one cache is shared by many threads"""
+    url, _ = gbif_stub
+    params = [{'scientificName': 'Bird A', 'offset': i % 4 * 5, 'limit': 5} for i in range(200)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda p: http_cache.get(url, params=p), params))
+
+    stats = http_cache.stats()
+    assert stats['hits'] + stats['misses'] == 200
+    assert stats['entries'] == 4
+
+    print("✓ test_http_cache_counts_every_threaded_call passed")
+
+
+def test_fetch_gbif_data_without_cache(gbif_stub, monkeypatch):
+    """Without the shared cache module every page is requested directly"""
+    monkeypatch.setattr('pipeline.HTTP_CACHE', None)
+    url, stats = gbif_stub
+    result = fetch_gbif_data(['Bird B'], 2023, base_url=url, page_size=5)
+    fetch_gbif_data(['Bird B'], 2023, base_url=url, page_size=5)
+
+    assert len(result) == 7
+    assert stats['requests'] == 4
+
+    print("✓ test_fetch_gbif_data_without_cache passed")
+
+
 def test_clean_biodiversity_data():
     """Test that clean_biodiversity_data removes invalid data and returns metrics"""
     sample_data = pd.DataFrame({
@@ -39,6 +221,70 @@ def test_clean_biodiversity_data():
     print("✓ test_clean_biodiversity_data passed")
 
 
+def test_clean_biodiversity_data_chunked_matches_in_memory():
+    """Streaming cleaning drops duplicates across chunks and matches the in-memory result"""
+    sample_data = pd.DataFrame({
+        'species_name': ['Bird A', 'Bird B', 'Bird A', None, 'Bird C', 'Bird B', 'Bird D'],
+        'latitude': [40.0, 41.0, 40.0, 42.0, 43.0, 41.0, 44.0],
+        'longitude': [-70.0, -71.0, -70.0, -72.0, -73.0, -71.0, -74.0],
+        'date': ['2023-01-01', '2023-02-15', '2023-01-01', '2023-03-20', 'invalid-date',
+                 '2023-02-15', '2023-04-02'],
+        'state': ['MA', 'NY', 'MA', 'CT', 'ME', 'NY', 'VT'],
+        'coordinate_uncertainty': [10, 20, 10, 30, 40, 20, None]})
+    expected_df, expected_metrics = clean_biodiversity_data(sample_data)
+
+    chunks = (sample_data.iloc[i:i + 2] for i in range(0, len(sample_data), 2))
+    cleaned_df, metrics = clean_biodiversity_data_chunked(chunks)
+
+    pd.testing.assert_frame_equal(cleaned_df, expected_df)
+    assert metrics == expected_metrics
+    assert metrics['removed_duplicates'] == 2, "Should remove duplicates split across chunks"
+
+    print("✓ test_clean_biodiversity_data_chunked_matches_in_memory passed")
+
+
+def test_clean_biodiversity_data_chunked_writes_output(tmp_path):
+    """With an output path the cleaned rows are streamed to CSV"""
+    raw_path = tmp_path / 'raw.csv'
+    out_path = tmp_path / 'clean.csv'
+    pd.DataFrame({
+        'species_name': ['Bird A', 'Bird B', 'Bird A', 'Bird C'],
+        'latitude': [40.0, 41.0, 40.0, 43.0],
+        'longitude': [-70.0, -71.0, -70.0, -73.0],
+        'date': ['2023-01-01', '2023-02-15', '2023-01-01', '2023-06-30'],
+        'state': ['MA', 'NY', 'MA', 'ME'],
+        'coordinate_uncertainty': [10, 20, 10, 40]}).to_csv(raw_path, index=False)
+
+    cleaned_df, metrics = clean_biodiversity_data_chunked(
+        pd.read_csv(raw_path, chunksize=1), output_path=out_path)
+    written = pd.read_csv(out_path)
+
+    assert cleaned_df is None
+    assert len(written) == metrics['clean_count'] == 3
+    assert written['month'].tolist() == [1, 2, 6]
+
+    print("✓ test_clean_biodiversity_data_chunked_writes_output passed")
+
+
+def test_clean_biodiversity_data_chunked_dtype_drift(tmp_path):
+    """A column read as all-NaN float64 in one chunk and as text in the next still dedups"""
+    raw_path = tmp_path / 'raw.csv'
+    raw_path.write_text(
+        "species_name,latitude,longitude,date,state,coordinate_uncertainty\n"
+        "A,42.1,-71.0,2023-05-01T10:00,,15\n"
+        "B,42.2,-71.1,2023-05-02T10:00,,\n"
+        "A,42.1,-71.0,2023-05-01T10:00,,15\n"
+        "C,42.3,-71.2,2023-05-03T10:00,Massachusetts,\n")
+    _, expected_metrics = clean_biodiversity_data(pd.read_csv(raw_path))
+
+    _, metrics = clean_biodiversity_data_chunked(pd.read_csv(raw_path, chunksize=2))
+
+    assert metrics == expected_metrics
+    assert metrics['removed_duplicates'] == 1
+
+    print("✓ test_clean_biodiversity_data_chunked_dtype_drift passed")
+
+
 def test_enrich_with_state_data():
     """Test that enrich_with_state_data adds region and area columns"""
     cleaned_data = pd.DataFrame({
@@ -62,3 +308,129 @@ def test_enrich_with_state_data():
     assert len(enriched_df) == len(cleaned_data), "Should keep all original rows"
 
     print("✓ test_enrich_with_state_data passed")
+
+
+def test_assign_states_from_coordinates():
+    """Points are assigned to the state around them in one vectorized call"""
+    state_index = build_state_index(pd.read_csv(STATE_BOUNDS_PATH))
+    # Boston, Providence, Denver, Honolulu, the Atlantic, missing coordinates
+    latitudes = [42.36, 41.82, 39.74, 21.31, 35.0, None]
+    longitudes = [-71.06, -71.41, -104.99, -157.86, -50.0, None]
+
+    states = assign_states(latitudes, longitudes, state_index)
+
+    assert list(states) == ['MA', 'RI', 'CO', 'HI', None, None]
+
+    print("✓ test_assign_states_from_coordinates passed")
+
+
+def test_enrich_with_state_coordinates_fills_missing_states():
+    """Only rows without a state are located from the coordinates"""
+    cleaned_data = pd.DataFrame({
+        'species_name': ['Bird A', 'Bird B', 'Bird C', 'Bird D'],
+        'latitude': [42.36, 42.65, 30.27, 41.76],
+        'longitude': [-71.06, -73.75, -97.74, -72.68],
+        'date': pd.to_datetime(['2023-01-15', '2023-02-20', '2023-03-10', '2023-04-05']),
+        'state': ['Massachusetts', None, 'Texsa', '  '],
+        'coordinate_uncertainty': [10, 20, 30, 40],
+        'month': [1, 2, 3, 4]})
+    state_ref = pd.read_csv('state_reference.csv')
+
+    result = enrich_with_state_coordinates(cleaned_data, state_ref)
+
+    assert result['state'].tolist() == ['Massachusetts', 'New York', 'Texsa', 'Connecticut']
+    assert result['region'].isna().tolist() == [False, False, True, False]
+
+    print("✓ test_enrich_with_state_coordinates_fills_missing_states passed")
+
+
+def test_enrich_with_state_coordinates_keeps_reported_text():
+    """Known text is never overridden, even inside another state's bounding box"""
+    cleaned_data = pd.DataFrame({
+        'species_name': ['Bird A', 'Bird B', 'Bird C'],
+        'latitude': [44.23, 38.90, 43.10],       # Kingston ON and Washington DC fall in the NY / MD boxes
+        'longitude': [-76.49, -77.04, -75.23],
+        'date': pd.to_datetime(['2023-01-15', '2023-02-20', '2023-03-10']),
+        'state': ['Ontario', 'District of Columbia', 'New York'],
+        'coordinate_uncertainty': [10, 20, 30],
+        'month': [1, 2, 3]})
+    state_ref = pd.read_csv('state_reference.csv')
+    state_index = build_state_index(pd.read_csv(STATE_BOUNDS_PATH))
+    assert list(assign_states(cleaned_data['latitude'], cleaned_data['longitude'], state_index)) == \
+        ['NY', 'MD', 'NY']
+
+    result = enrich_with_state_coordinates(cleaned_data, state_ref, state_index)
+    expected = enrich_with_state_data(cleaned_data, state_ref.copy())
+
+    assert result['state'].tolist() == ['Ontario', 'District Of Columbia', 'New York']
+    pd.testing.assert_frame_equal(result, expected)
+
+    print("✓ test_enrich_with_state_coordinates_keeps_reported_text passed")
+
+
+def test_aggregate_observations():
+    """One aggregation pass feeds the counts, densities and date range of the report"""
+    enriched_data = pd.DataFrame({
+        'species_name': ['Bird A', 'Bird B', 'Bird A', 'Bird A'],
+        'date': pd.to_datetime(['2023-01-15', '2023-02-20', '2023-02-21', '2023-03-01']),
+        'state': ['Massachusetts', 'Massachusetts', 'Texas', 'Ontario'],
+        'month': [1, 2, 2, 3],
+        'region': ['Southern New England', 'Southern New England', 'South', None],
+        'area_sq_km': [20202.0, 20202.0, 676587.0, None]})
+
+    analysis = aggregate_observations(enriched_data)
+    output = analysis_output(analysis)
+
+    assert output['observations_by_state'] == {'Massachusetts': 2, 'Ontario': 1, 'Texas': 1}
+    assert output['observations_by_region'] == {'Southern New England': 2, 'South': 1}
+    assert output['observations_by_month'] == {1: 1, 2: 2, 3: 1}
+    assert output['observations_by_species'] == {'Bird A': 3, 'Bird B': 1}
+    assert output['states_covered'] == 3
+    assert output['date_range'] == {'earliest': '2023-01-15', 'latest': '2023-03-01'}
+    assert analysis['density'].index.tolist() == ['Massachusetts', 'Texas'], "Sorted by density"
+    assert analysis['species_month']['count'].sum() == 4
+
+    print("✓ test_aggregate_observations passed")
+
+
+def test_render_figures_skips_unchanged(tmp_path):
+    """Figures are rendered headless, in parallel, and only redrawn when their data changes"""
+    data = pd.DataFrame({'month': [1, 1, 2], 'count': [3, 4, 5], 'species_name': ['A', 'B', 'A']})
+    manifest = tmp_path / 'manifest.json'
+    specs = [{'kind': 'barplot', 'path': str(tmp_path / f'fig{i}.png'), 'data': data,
+              'x': 'month', 'y': 'count', 'hue': 'species_name', 'dpi': 30} for i in range(2)]
+
+    first = render_figures(specs, max_workers=2, manifest_path=manifest)
+    second = render_figures(specs, max_workers=2, manifest_path=manifest)
+    specs[1]['data'] = data.assign(count=[3, 4, 6])
+    third = render_figures(specs, max_workers=2, manifest_path=manifest)
+
+    assert all((tmp_path / f'fig{i}.png').exists() for i in range(2))
+    assert set(first.values()) == {'rendered'}
+    assert set(second.values()) == {'skipped'}
+    assert list(third.values()) == ['skipped', 'rendered']
+
+    print("✓ test_render_figures_skips_unchanged passed")
+
+
+def test_instrumentation_writes_json_lines(tmp_path):
+    """Stage records go to a JSON lines file while instrumentation is enabled"""
+    trace = tmp_path / 'trace.jsonl'
+    sample_data = pd.DataFrame({
+        'species_name': ['Bird A', 'Bird A', None],
+        'latitude': [40.0, 40.0, 41.0],
+        'longitude': [-70.0, -70.0, -71.0],
+        'date': ['2023-01-01', '2023-01-01', '2023-02-01'],
+        'state': ['MA', 'MA', 'NY'],
+        'coordinate_uncertainty': [10, 10, 20]})
+
+    enable(JSONLinesSink(trace))
+    try:
+        clean_biodiversity_data(sample_data)
+    finally:
+        disable()
+
+    records = [json.loads(line) for line in trace.read_text().splitlines()]
+    assert [(r['stage'], r['rows_in'], r['rows_out']) for r in records] == [('clean_biodiversity_data', 3, 1)]
+
+    print("✓ test_instrumentation_writes_json_lines passed")
@@ -1,8 +1,17 @@
+import os
+import numpy as np
 import pandas as pd
 
+try:
+    import pyarrow as pa
+except ImportError:  # fall back to parsing the CSV every time
+    pa = None
+
 # constants
 
 DATA_PATH = "cause_of_deaths.csv"
+ARROW_PATH = "cause_of_deaths.arrow"
+CUBE_PATH = "cause_of_deaths.cube.npy"   # _cube saved by prepare_data, memory-mapped by workers
 
 DISEASES = [
     "Meningitis", "Alzheimer's Disease and Other Dementias", "Parkinson's Disease",
@@ -17,6 +26,10 @@ DISEASES = [
     "Digestive Diseases", "Fire, Heat, and Hot Substances", "Acute Hepatitis"
 ]
 
+# typed schema for the Arrow copy of DATA_PATH
+SCHEMA = {"Country": "category", "Code": "category", "Year": "int16"}
+SCHEMA.update({disease: "int32" for disease in DISEASES})
+
 # regions mapping
 REGION_MAP = {
     "AFR": "Africa", "AMR": "Americas", "EMR": "Eastern Mediterranean",
@@ -27,26 +40,144 @@ REGION_MAP = {
 
 _df = None
 
+# indexed store, built once by load_data
+_country_pos = {}   # country -> axis 0 of _cube
+_year_pos = {}      # year -> axis 1 of _cube
+_disease_pos = {}   # disease -> axis 2 of _cube
+_cube = None        # country x year x disease death counts
+_row_pos = None     # country x year -> row position in _df, -1 if missing
+_row_country = None # row position in _df -> axis 0 of _cube
+_year_rows = {}     # year -> row positions in _df, in file order
+_labels = {}        # Country / Code / Year -> column array of _df, for building query frames
+
 def load_data() -> pd.DataFrame:
     global _df
     if _df is None:
-        _df = pd.read_csv(DATA_PATH)
-        _df.columns = _df.columns.str.strip()
-        _df = _df.rename(columns={"Country/Territory": "Country"})
+        if pa is None:
+            _df = _read_csv()
+        else:
+            _df = _read_arrow()
+        _build_store(_df, CUBE_PATH if pa is not None else None)
     return _df
 
 
+def _read_csv() -> pd.DataFrame:
+    """Parse DATA_PATH, tidy the column names and apply SCHEMA."""
+    df = pd.read_csv(DATA_PATH)
+    df.columns = df.columns.str.strip()
+    df = df.rename(columns={"Country/Territory": "Country"})
+    return df.astype(SCHEMA)
+
+
+def _read_arrow() -> pd.DataFrame:
+    """
+    Memory-map the typed Arrow IPC copy of the dataset, rebuilding it first
+    if it is missing or older than the CSV it was converted from.
+    """
+    csv_mtime = str(os.stat(DATA_PATH).st_mtime_ns).encode() if os.path.exists(DATA_PATH) else None
+    if os.path.exists(ARROW_PATH):
+        table = pa.ipc.open_file(pa.memory_map(ARROW_PATH, "r")).read_all()
+        if csv_mtime is None or table.schema.metadata.get(b"csv_mtime") == csv_mtime:
+            # split_blocks keeps each numeric column backed by the mapped buffer
+            return table.to_pandas(split_blocks=True)
+
+    df = _read_csv()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**table.schema.metadata, b"csv_mtime": csv_mtime})
+    tmp_path = ARROW_PATH + ".tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, ARROW_PATH)
+    return df
+
+
+def prepare_data() -> None:
+    """
+    Build or refresh ARROW_PATH and CUBE_PATH ahead of time so that worker
+    processes started afterwards only memory-map them, sharing the same
+    page cache. The small index dicts and the sunburst store (built on
+    first use of the Region tab) are still private to each worker.
+    """
+    if pa is None:
+        return
+    _build_store(_read_arrow())
+    tmp_path = CUBE_PATH + ".tmp.npy"
+    np.save(tmp_path, _cube)
+    os.replace(tmp_path, CUBE_PATH)
+
+
+def _mapped_cube(cube_path: str, shape: tuple, dtype) -> np.ndarray:
+    """The cube saved by prepare_data, memory-mapped; None if missing or older than ARROW_PATH."""
+    if cube_path is None or not os.path.exists(cube_path) or not os.path.exists(ARROW_PATH):
+        return None
+    if os.path.getmtime(cube_path) < os.path.getmtime(ARROW_PATH):
+        return None
+    cube = np.load(cube_path, mmap_mode="r")
+    return cube if cube.shape == shape and cube.dtype == dtype else None
+
+
+def _build_store(df: pd.DataFrame, cube_path: str = None) -> None:
+    """
+    Index rows by (Country, Year) and pack the disease columns into a
+    dense country x year x disease cube so queries slice instead of scan.
+    With cube_path, a fresh cube saved by prepare_data is memory-mapped
+    instead of packed again.
+    """
+    global _country_pos, _year_pos, _disease_pos, _cube, _row_pos, _row_country, _year_rows, _labels
+    country_codes, country_labels = pd.factorize(df["Country"])
+    year_codes, year_labels = pd.factorize(df["Year"], sort=True)
+
+    _country_pos = {c: i for i, c in enumerate(country_labels)}
+    _year_pos = {int(y): i for i, y in enumerate(year_labels)}
+    _disease_pos = {d: i for i, d in enumerate(DISEASES)}
+
+    shape = (len(country_labels), len(year_labels), len(DISEASES))
+    _cube = _mapped_cube(cube_path, shape, df[DISEASES[0]].dtype)
+    if _cube is None:
+        values = df[DISEASES].to_numpy()
+        _cube = np.zeros(shape, dtype=values.dtype)
+        _cube[country_codes, year_codes] = values
+
+    _row_pos = np.full((len(country_labels), len(year_labels)), -1, dtype=np.int64)
+    _row_pos[country_codes, year_codes] = np.arange(len(df))
+    _row_country = country_codes
+    _year_rows = {y: np.flatnonzero(year_codes == i) for y, i in _year_pos.items()}
+    _labels = {col: df[col].array for col in ("Country", "Code", "Year")}
+
+
+def _rows_for_year(year: int) -> np.ndarray:
+    """Row positions of every country reported in the given year."""
+    return _year_rows.get(year, np.empty(0, dtype=np.int64))
+
+
+def _year_deaths(disease: str, year: int) -> tuple:
+    """Row positions of the given year and their death counts for one disease, read from _cube."""
+    rows = _rows_for_year(year)
+    return rows, _cube[_row_country[rows], _year_pos.get(year, 0), _disease_pos[disease]]
+
+
+def _query_frame(rows: np.ndarray, columns: list, deaths: np.ndarray) -> pd.DataFrame:
+    """
+    Label columns taken at the given row positions plus a Deaths column,
+    indexed like the same rows of _df, without touching any other column.
+    """
+    frame = {col: _labels[col].take(rows) for col in columns}
+    frame["Deaths"] = deaths
+    return pd.DataFrame(frame, index=_df.index[rows])
+
+
 # query functions
 
 def get_years() -> list:
-    df = load_data()
-    return sorted(df["Year"].unique().tolist())
+    load_data()
+    return list(_year_pos)
 
 
 def get_countries() -> list:
     """Return sorted list of all countries."""
-    df = load_data()
-    return sorted(df["Country"].unique().tolist())
+    load_data()
+    return sorted(_country_pos)
 
 
 def get_diseases() -> list:
@@ -59,19 +190,20 @@ def get_map_data(disease: str, year: int) -> pd.DataFrame:
     Return a DataFrame with Country, Code, and death count
     for a given disease and year. Used for choropleth map.
     """
-    df = load_data()
-    filtered = df[df["Year"] == year][["Country", "Code", disease]].copy()
-    filtered = filtered.rename(columns={disease: "Deaths"})
-    filtered = filtered.dropna(subset=["Deaths"])
-    return filtered
+    load_data()
+    rows, deaths = _year_deaths(disease, year)
+    return _query_frame(rows, ["Country", "Code"], deaths)
 
 
 def get_top_countries(disease: str, year: int, n: int = 10) -> pd.DataFrame:
     """
     Return top N countries by death count for a given disease and year.
     """
-    df = get_map_data(disease, year)
-    return df.nlargest(n, "Deaths").reset_index(drop=True)
+    load_data()
+    rows, deaths = _year_deaths(disease, year)
+    # stable sort on negated counts: largest first, ties in file order (as nlargest)
+    top = np.argsort(-deaths.astype(np.int64), kind="stable")[:n]
+    return _query_frame(rows[top], ["Country", "Code"], deaths[top]).reset_index(drop=True)
 
 
 def get_trend_data(disease: str, countries: list) -> pd.DataFrame:
@@ -79,10 +211,15 @@ def get_trend_data(disease: str, countries: list) -> pd.DataFrame:
     Return year-over-year death counts for selected countries and disease.
     Used for the trend line chart.
     """
-    df = load_data()
-    filtered = df[df["Country"].isin(countries)][["Country", "Year", disease]].copy()
-    filtered = filtered.rename(columns={disease: "Deaths"})
-    return filtered.sort_values(["Country", "Year"])
+    load_data()
+    ci = np.array([_country_pos[c] for c in set(countries) if c in _country_pos], dtype=np.int64)
+    picked, yi = np.nonzero(_row_pos[ci] >= 0)
+    ci = ci[picked]
+    rows = _row_pos[ci, yi]
+    # order by Country (category order, as sort_values does) then Year; yi follows sorted years
+    order = np.lexsort((yi, _labels["Country"].codes[rows]))
+    ci, yi, rows = ci[order], yi[order], rows[order]
+    return _query_frame(rows, ["Country", "Year"], _cube[ci, yi, _disease_pos[disease]])
 
 
 def get_disease_breakdown(country: str, year: int) -> pd.DataFrame:
@@ -90,12 +227,12 @@ def get_disease_breakdown(country: str, year: int) -> pd.DataFrame:
     Return all disease death counts for a single country and year.
     Used for the disease breakdown bar chart.
     """
-    df = load_data()
-    row = df[(df["Country"] == country) & (df["Year"] == year)]
-    if row.empty:
+    load_data()
+    ci = _country_pos.get(country)
+    yi = _year_pos.get(year)
+    if ci is None or yi is None or _row_pos[ci, yi] < 0:
         return pd.DataFrame(columns=["Disease", "Deaths"])
-    values = row[DISEASES].iloc[0]
-    result = pd.DataFrame({"Disease": DISEASES, "Deaths": values.values})
+    result = pd.DataFrame({"Disease": DISEASES, "Deaths": _cube[ci, yi]})
     return result.sort_values("Deaths", ascending=False).reset_index(drop=True)
 
 
@@ -103,12 +240,14 @@ def get_summary_stats(disease: str, year: int) -> dict:
     """
     Return summary statistics for a disease in a given year.
     """
-    df = get_map_data(disease, year)
+    df = load_data()
+    rows, deaths = _year_deaths(disease, year)
+    top = deaths.argmax()
     return {
-        "total": int(df["Deaths"].sum()),
-        "mean": int(df["Deaths"].mean()),
-        "max_country": df.loc[df["Deaths"].idxmax(), "Country"],
-        "max_deaths": int(df["Deaths"].max()),
+        "total": int(deaths.sum()),
+        "mean": int(deaths.sum(dtype=np.float64) / len(deaths)),
+        "max_country": df["Country"].iat[rows[top]],
+        "max_deaths": int(deaths[top]),
     }
 
 
@@ -125,6 +264,42 @@ def get_all_years_data(disease: str) -> pd.DataFrame:
     return filtered.sort_values("Year")
 
 
+# raw data paging: (column, ascending) -> row positions of the whole table in sorted order
+_sort_orders = {}
+
+def _stable_order(values: np.ndarray, ascending: bool) -> np.ndarray:
+    """Positions that sort values either way, with ties kept in file order."""
+    ranks = pd.factorize(values, sort=True)[0]   # dense ranks, so strings can be negated too
+    return np.argsort(ranks if ascending else -ranks, kind="stable")
+
+
+def get_raw_page(country: str = "All", disease: str = "All", page: int = 1,
+                 page_size: int = 20, sort_by: str = None, ascending: bool = True) -> tuple:
+    """
+    Return one page of the raw table and the total number of matching rows.
+    Rows come from the country index instead of a full-table filter, and only
+    the page_size rows of the requested page are materialized.
+    Used for the server-side paginated Raw Data tab.
+    """
+    df = load_data()
+    if country == "All":
+        rows = np.arange(len(df))
+        if sort_by is not None:
+            if (sort_by, ascending) not in _sort_orders:
+                _sort_orders[sort_by, ascending] = _stable_order(df[sort_by].to_numpy(), ascending)
+            rows = _sort_orders[sort_by, ascending]
+    else:
+        ci = _country_pos.get(country)
+        rows = np.empty(0, dtype=np.int64) if ci is None else _row_pos[ci][_row_pos[ci] >= 0]
+        if sort_by is not None:
+            rows = rows[_stable_order(df[sort_by].to_numpy()[rows], ascending)]
+
+    cols = ["Country", "Code", "Year"] + (DISEASES if disease == "All" else [disease])
+    start = (max(page, 1) - 1) * page_size
+    window = df.iloc[rows[start:start + page_size]][cols]
+    return window, len(rows)
+
+
 # country to region mapping for sunburst grouping
 COUNTRY_REGION = {
     "Afghanistan": "Asia", "Albania": "Europe", "Algeria": "Africa",
@@ -179,14 +354,15 @@ COUNTRY_REGION = {
     "Yemen": "Asia", "Zambia": "Africa", "Zimbabwe": "Africa",
 }
 
-def get_sunburst_data(year: int, top_n_countries: int = 5) -> pd.DataFrame:
+# sunburst store: year -> (melted region/country/disease rows, country rank within region per row)
+_sunburst = {}
+
+def _materialize_sunburst_year(df: pd.DataFrame, year: int) -> tuple:
     """
-    Return data structured for a sunburst chart:
-    World → Region → Country → Disease
-    Shows top_n_countries per region by total deaths.
+    Melt one year into Region → Country → Disease rows and rank every
+    country within its region by total deaths.
     """
-    df = load_data()
-    df = df[df["Year"] == year].copy()
+    df = df.iloc[_rows_for_year(year)].copy()
 
     # add region
     df["Region"] = df["Country"].map(COUNTRY_REGION).fillna("Other")
@@ -202,13 +378,30 @@ def get_sunburst_data(year: int, top_n_countries: int = 5) -> pd.DataFrame:
     melted = melted.dropna(subset=["Deaths"])
     melted["Deaths"] = melted["Deaths"].astype(int)
 
-    # keep only top N countries per region by total deaths
+    # rank countries per region by total deaths (0 = largest)
     country_totals = melted.groupby(["Region", "Country"])["Deaths"].sum().reset_index()
-    top_countries = (
-        country_totals.sort_values("Deaths", ascending=False)
-        .groupby("Region")
-        .head(top_n_countries)["Country"]
-        .tolist())
-    melted = melted[melted["Country"].isin(top_countries)]
-
-    return melted
\ No newline at end of file
+    ranked = country_totals.sort_values("Deaths", ascending=False)
+    ranked["Rank"] = ranked.groupby("Region").cumcount()
+    rank = melted["Country"].map(ranked.set_index("Country")["Rank"]).to_numpy()
+    return melted, rank
+
+
+def materialize_sunburst() -> None:
+    """Precompute sunburst rows and country rankings for every year."""
+    df = load_data()
+    for year in get_years():
+        _sunburst[year] = _materialize_sunburst_year(df, year)
+
+
+def get_sunburst_data(year: int, top_n_countries: int = 5) -> pd.DataFrame:
+    """
+    Return data structured for a sunburst chart:
+    World → Region → Country → Disease
+    Shows top_n_countries per region by total deaths.
+    """
+    if not _sunburst:
+        materialize_sunburst()
+    melted, rank = _sunburst.get(year) or _materialize_sunburst_year(load_data(), year)
+
+    # keep only top N countries per region by total deaths
+    return melted[rank < top_n_countries]
@@ -0,0 +1,46 @@
+"""
+Per-interaction cost of the world map: rebuilding a px.choropleth for every
+year-slider move vs. swapping in a frame of the pre-built animated figure.
+Reports server-side build + JSON serialization time and payload size.
+Run from this folder: python benchmark_choropleth.py
+"""
+import time
+import plotly.io as pio
+import api_layer as api
+import viz_layer as viz
+
+DISEASE = "Cardiovascular Diseases"
+
+
+def per_interaction(func, years):
+    sizes = []
+    start = time.perf_counter()
+    for year in years:
+        sizes.append(len(pio.to_json(func(year))))
+    elapsed_ms = (time.perf_counter() - start) / len(years) * 1000
+    return elapsed_ms, sum(sizes) / len(sizes)
+
+
+def main():
+    years = api.get_years()
+
+    start = time.perf_counter()
+    animated = viz.make_animated_choropleth(api.get_all_years_data(DISEASE), DISEASE).to_dict()
+    build_ms = (time.perf_counter() - start) * 1000
+    animated_kb = len(pio.to_json(animated)) / 1024
+    frame_kb = len(pio.to_json(animated["frames"][0])) / 1024
+
+    old_ms, old_bytes = per_interaction(
+        lambda year: viz.make_choropleth(api.get_map_data(DISEASE, year), DISEASE, year), years)
+    new_ms, new_bytes = per_interaction(
+        lambda year: viz.select_frame(animated, DISEASE, year), years)
+
+    print(f"Animated figure ({len(years)} frames): built once in {build_ms:.1f} ms, {animated_kb:.1f} KB total, "
+          f"{frame_kb:.1f} KB per frame")
+    print(f"Rebuild px.choropleth per move: {old_ms:.2f} ms, {old_bytes / 1024:.1f} KB payload")
+    print(f"Swap pre-built frame per move:  {new_ms:.2f} ms, {new_bytes / 1024:.1f} KB payload")
+    print(f"In animated mode a slider move is a client-side frame swap: 0 bytes from the server")
+
+
+if __name__ == "__main__":
+    main()
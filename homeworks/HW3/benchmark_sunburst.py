@@ -0,0 +1,47 @@
+"""
+Per-call latency of get_sunburst_data: precomputed rankings vs. the
+on-demand melt/groupby/sort path it replaced.
+Run from this folder: python benchmark_sunburst.py
+"""
+import time
+import api_layer as api
+
+REPEATS = 5
+TOP_N_RANGE = range(3, 11)   # matches the Top N slider in dashboard_layer
+
+
+def on_demand(year, top_n):
+    """The old request-time path: melt, rank and filter on every call."""
+    melted, rank = api._materialize_sunburst_year(api.load_data(), year)
+    return melted[rank < top_n]
+
+
+def time_calls(func, years):
+    calls = 0
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        for year in years:
+            for top_n in TOP_N_RANGE:
+                func(year, top_n)
+                calls += 1
+    return (time.perf_counter() - start) / calls * 1000
+
+
+def main():
+    years = api.get_years()
+
+    start = time.perf_counter()
+    api.materialize_sunburst()
+    build_ms = (time.perf_counter() - start) * 1000
+
+    old_ms = time_calls(on_demand, years)
+    new_ms = time_calls(api.get_sunburst_data, years)
+
+    print(f"One-time materialization ({len(years)} years): {build_ms:.1f} ms")
+    print(f"On-demand path:   {old_ms:.3f} ms per call")
+    print(f"Precomputed path: {new_ms:.3f} ms per call")
+    print(f"Speedup: {old_ms / new_ms:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
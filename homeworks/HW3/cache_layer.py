@@ -0,0 +1,86 @@
+"""
+Bounded LRU cache shared by every dashboard session.
+Keys are built from the callback arguments, so the same (disease, year)
+asked for by two users is only computed once.
+
+`panel serve` re-runs dashboard_layer.py for every session, so the shared
+cache instances live here, in a module imported once per worker process.
+"""
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+
+class LRUCache:
+    """Size-bounded least-recently-used cache with hit/miss counters."""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for key, calling compute() on a miss."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+
+        # compute outside the lock so one slow figure does not block other sessions
+        value = compute()
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+            }
+
+    def __len__(self):
+        return len(self._data)
+
+
+def _freeze(value):
+    """Turn list arguments (e.g. selected countries) into hashable tuples."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def cached(cache: LRUCache):
+    """Decorator: memoize a function in the given cache, keyed on its name and arguments."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (func.__name__, _freeze(args), tuple(sorted((k, _freeze(v)) for k, v in kwargs.items())))
+            return cache.get_or_compute(key, lambda: func(*args, **kwargs))
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+
+# process-wide caches used by dashboard_layer
+RESULT_CACHE = LRUCache(maxsize=512)   # api_layer query results
+FIGURE_CACHE = LRUCache(maxsize=256)   # Plotly figures serialized to dicts
@@ -1,9 +1,38 @@
 import panel as pn
+import param
 import api_layer as api
 import viz_layer as viz
+import cache_layer as cache
 
 pn.extension("plotly", "tabulator")
 
+# SHARED CACHES
+# one cache for api query results, one for serialized Plotly figures,
+# shared across every session served by this process
+
+RESULT_CACHE = cache.RESULT_CACHE
+FIGURE_CACHE = cache.FIGURE_CACHE
+
+get_summary_stats = cache.cached(RESULT_CACHE)(api.get_summary_stats)
+get_trend_data = cache.cached(RESULT_CACHE)(api.get_trend_data)
+get_sunburst_data = cache.cached(RESULT_CACHE)(api.get_sunburst_data)
+
+@cache.cached(FIGURE_CACHE)
+def animated_choropleth(disease):
+    return viz.make_animated_choropleth(api.get_all_years_data(disease), disease).to_dict()
+
+@cache.cached(FIGURE_CACHE)
+def choropleth_figure(disease, year):
+    return viz.select_frame(animated_choropleth(disease), disease, year)
+
+@cache.cached(FIGURE_CACHE)
+def trend_figure(disease, countries):
+    return viz.make_trend_chart(get_trend_data(disease, countries), disease, countries).to_dict()
+
+@cache.cached(FIGURE_CACHE)
+def sunburst_figure(year, top_n):
+    return viz.make_sunburst(get_sunburst_data(year, top_n), year).to_dict()
+
 # WIDGETS
 
 years = api.get_years()
@@ -25,6 +54,8 @@ year_slider = pn.widgets.IntSlider(
     step=1,
     width=280,)
 
+map_animate = pn.widgets.Checkbox(name="Animate all years", value=False)
+
 # Tab 2 — Trend Over Time
 trend_disease_select = pn.widgets.Select(
     name="Disease",
@@ -77,18 +108,41 @@ data_search_disease = pn.widgets.Select(
     options=["All"] + diseases,
     width=280,)
 
+RAW_PAGE_SIZE = 20
+
+data_sort_column = pn.widgets.Select(
+    name="Sort by",
+    value="None",
+    options=["None", "Country", "Code", "Year"] + diseases,
+    width=280,)
+
+data_sort_desc = pn.widgets.Checkbox(name="Descending", value=False)
+
+data_page = pn.widgets.IntInput(name="Page", value=1, start=1, width=280)
+
+def on_filter_change(event):
+    data_page.value = 1
+
+for widget in (data_search_country, data_search_disease, data_sort_column, data_sort_desc):
+    widget.param.watch(on_filter_change, "value")
+
 
 # REACTIVE CALLBACKS
 # Tab 1: World Map
 
-@pn.depends(map_disease_select, year_slider)
-def world_map_plot(disease, year):
-    map_df = api.get_map_data(disease, year)
-    return pn.pane.Plotly(viz.make_choropleth(map_df, disease, year), height=450, sizing_mode="stretch_width")
+_map_shown = {}   # disease / animate of the map on screen in this session
+
+@pn.depends(map_disease_select, year_slider, map_animate)
+def world_map_plot(disease, year, animate=False):
+    if animate and _map_shown == {"disease": disease, "animate": True}:
+        raise param.Skip   # only the year moved; the animation already holds every year
+    _map_shown.update(disease=disease, animate=animate)
+    fig = animated_choropleth(disease) if animate else choropleth_figure(disease, year)
+    return pn.pane.Plotly(fig, height=450, sizing_mode="stretch_width")
 
 @pn.depends(map_disease_select, year_slider)
 def map_summary_card(disease, year):
-    stats = api.get_summary_stats(disease, year)
+    stats = get_summary_stats(disease, year)
     return pn.pane.Markdown(f"""
 ### 📊 Quick Stats — {year}
 | Metric | Value |
@@ -104,36 +158,37 @@ def map_summary_card(disease, year):
 
 @pn.depends(trend_disease_select, country_multi)
 def trend_plot(disease, countries):
-    trend_df = api.get_trend_data(disease, countries)
-    return pn.pane.Plotly(viz.make_trend_chart(trend_df, disease, countries), height=450, sizing_mode="stretch_width")
+    return pn.pane.Plotly(trend_figure(disease, countries), height=450, sizing_mode="stretch_width")
 
 
 # Tab 3: Region Explorer
 
 @pn.depends(sunburst_year, sunburst_top_n, reset_counter)
 def sunburst_plot(year, top_n, _counter):
-    sb_df = api.get_sunburst_data(year, top_n)
-    return pn.pane.Plotly(viz.make_sunburst(sb_df, year), height=600, sizing_mode="stretch_width")
+    return pn.pane.Plotly(sunburst_figure(year, top_n), height=600, sizing_mode="stretch_width")
 
 
 # Tab 4: Raw Data
 
-@pn.depends(data_search_country, data_search_disease)
-def raw_data_table(country, disease):
-    df = api.load_data().copy()
-    if country != "All":
-        df = df[df["Country"] == country]
-    cols = ["Country", "Code", "Year"]
-    if disease != "All":
-        cols += [disease]
-    else:
-        cols += api.get_diseases()
-    return pn.widgets.Tabulator(
-        df[cols].reset_index(drop=True),
-        pagination="remote",
-        page_size=20,
-        sizing_mode="stretch_width",
-        height=500,)
+@pn.depends(data_search_country, data_search_disease, data_sort_column, data_sort_desc, data_page)
+def raw_data_table(country, disease, sort_column, descending, page):
+    sort_by = None if sort_column == "None" else sort_column
+    page_df, total = api.get_raw_page(country, disease, page, RAW_PAGE_SIZE, sort_by, not descending)
+    n_pages = max(1, -(-total // RAW_PAGE_SIZE))
+    data_page.end = n_pages
+    if page > n_pages:   # typed past the end: show the last page
+        page = n_pages
+        page_df, total = api.get_raw_page(country, disease, page, RAW_PAGE_SIZE, sort_by, not descending)
+    start = (page - 1) * RAW_PAGE_SIZE
+    page_df.index = range(start, start + len(page_df))
+    return pn.Column(
+        pn.pane.Markdown(f"Page **{page}** of {n_pages:,} — {total:,} rows"),
+        pn.widgets.Tabulator(
+            page_df,
+            sortable=False,   # header sorting would only reorder this page; use "Sort by"
+            sizing_mode="stretch_width",
+            height=500,),
+        sizing_mode="stretch_width",)
 
 
 # LAYOUT
@@ -149,6 +204,7 @@ tab1_controls = pn.Column(
     pn.pane.Markdown("### 🔧 Controls"),
     map_disease_select,
     year_slider,
+    map_animate,
     pn.layout.Divider(),
     map_summary_card,
     width=300,
@@ -198,8 +254,11 @@ tab4_controls = pn.Column(
     pn.pane.Markdown("### 🔧 Filters"),
     data_search_country,
     data_search_disease,
+    data_sort_column,
+    data_sort_desc,
+    data_page,
     pn.pane.Markdown(
-        "_Browse and filter the raw dataset. Pagination shows 20 rows at a time._",
+        "_Browse and filter the raw dataset. Only the 20 rows of the current page are sent to the browser._",
         styles={"font-size": "12px", "color": "gray"},),
     width=300,
     styles={"background": "#f0f0f0", "padding": "16px", "border-radius": "8px"},)
@@ -0,0 +1,103 @@
+"""
+Local callback benchmark for the dashboard (not a browser/websocket load test).
+
+Calls the dashboard_layer callbacks directly in forked worker processes,
+so it measures query + figure time and queueing per worker, but not
+Bokeh serialization or real Panel sessions. Simulates CLIENTS sessions
+that each fire one random widget event per round. Events are spread round-robin over N worker processes, the same
+way `panel serve --num-procs N` spreads sessions; a process handles one
+callback at a time, so an event's latency includes the time it waits
+behind other sessions' events on the same worker.
+
+Run from this folder: python load_test.py --workers 1 2 4 --clients 16 --rounds 20
+"""
+import argparse
+import random
+import time
+import multiprocessing as mp
+import numpy as np
+import api_layer as api
+
+
+def make_events(clients: int, rounds: int, seed: int = 0) -> list:
+    """One random (callback, args) event per client per round."""
+    rng = random.Random(seed)
+    diseases = api.get_diseases()
+    countries = api.get_countries()
+    years = api.get_years()
+    events = []
+    for _ in range(rounds):
+        batch = []
+        for _ in range(clients):
+            kind = rng.choice(["map", "summary", "trend", "sunburst", "raw"])
+            if kind in ("map", "summary"):
+                args = (rng.choice(diseases), rng.choice(years))
+            elif kind == "trend":
+                args = (rng.choice(diseases), rng.sample(countries, 3))
+            elif kind == "sunburst":
+                args = (rng.choice(years), rng.randint(3, 10), 0)
+            else:
+                args = (rng.choice(["All"] + countries), "All", "None", False, rng.randint(1, 5))
+            batch.append((kind, args))
+        events.append(batch)
+    return events
+
+
+def run_worker(rounds: list) -> tuple:
+    """
+    Run this worker's share of every round.
+    Returns per-event latencies in ms and the worker's busy time in seconds.
+    """
+    import dashboard_layer as dash   # imported here so each worker builds its own session state
+    callbacks = {
+        "map": dash.world_map_plot,
+        "summary": dash.map_summary_card,
+        "trend": dash.trend_plot,
+        "sunburst": dash.sunburst_plot,
+        "raw": dash.raw_data_table,
+    }
+    latencies = []
+    start = time.perf_counter()
+    for batch in rounds:
+        round_start = time.perf_counter()
+        for kind, args in batch:
+            callbacks[kind](*args)
+            latencies.append((time.perf_counter() - round_start) * 1000)
+    return latencies, time.perf_counter() - start
+
+
+def run(workers: int, events: list) -> dict:
+    shares = [[batch[w::workers] for batch in events] for w in range(workers)]
+    with mp.get_context("fork").Pool(workers) as pool:
+        results = pool.map(run_worker, shares, chunksize=1)
+    latencies = np.concatenate([np.array(lat) for lat, _ in results])
+    elapsed = max(busy for _, busy in results)
+    return {
+        "workers": workers,
+        "events": len(latencies),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "events_per_sec": len(latencies) / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test dashboard callbacks across worker counts.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    # build the shared Arrow file once; forked workers share its mapped pages
+    api.prepare_data()
+    events = make_events(args.clients, args.rounds)
+
+    print(f"{'Workers':<10}{'Events':<10}{'p50 (ms)':<12}{'p95 (ms)':<12}{'Events/sec':<12}")
+    print("-" * 56)
+    for workers in args.workers:
+        r = run(workers, events)
+        print(f"{r['workers']:<10}{r['events']:<10}{r['p50_ms']:<12.1f}{r['p95_ms']:<12.1f}{r['events_per_sec']:<12.1f}")
+
+
+if __name__ == "__main__":
+    main()
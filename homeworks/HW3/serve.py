@@ -0,0 +1,36 @@
+"""
+Serve the dashboard from several Panel worker processes.
+
+The Arrow copy of the dataset and the country x year x disease cube are
+built once here, before the workers start; every worker then memory-maps
+the same two files instead of parsing the CSV and holding private copies.
+Not shared: each worker's small index dicts, its query/figure caches and
+the sunburst store (~7.5 MB, built the first time the Region tab is used).
+
+Run from this folder: python serve.py --workers 4 --port 5006
+"""
+import argparse
+import subprocess
+import sys
+import api_layer as api
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the causes-of-death dashboard.")
+    parser.add_argument("--workers", type=int, default=1, help="Panel worker processes (0 = one per core)")
+    parser.add_argument("--port", type=int, default=5006)
+    args = parser.parse_args()
+
+    api.prepare_data()
+
+    cmd = [
+        sys.executable, "-m", "panel", "serve", "dashboard_layer.py",
+        "--port", str(args.port),
+        "--num-procs", str(args.workers),
+    ]
+    print(f"Serving on port {args.port} with {args.workers or 'auto'} worker process(es)")
+    subprocess.run(cmd, check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import os
+import pandas as pd
+import pytest
+import api_layer as api
+
+
+# reference versions: the boolean-mask queries the indexed store replaced
+
+def old_map_data(df, disease, year):
+    filtered = df[df["Year"] == year][["Country", "Code", disease]].copy()
+    filtered = filtered.rename(columns={disease: "Deaths"})
+    return filtered.dropna(subset=["Deaths"])
+
+
+def old_top_countries(df, disease, year, n=10):
+    return old_map_data(df, disease, year).nlargest(n, "Deaths").reset_index(drop=True)
+
+
+def old_trend_data(df, disease, countries):
+    filtered = df[df["Country"].isin(countries)][["Country", "Year", disease]].copy()
+    filtered = filtered.rename(columns={disease: "Deaths"})
+    return filtered.sort_values(["Country", "Year"])
+
+
+def old_disease_breakdown(df, country, year):
+    row = df[(df["Country"] == country) & (df["Year"] == year)]
+    if row.empty:
+        return pd.DataFrame(columns=["Disease", "Deaths"])
+    result = pd.DataFrame({"Disease": api.DISEASES, "Deaths": row[api.DISEASES].iloc[0].values})
+    return result.sort_values("Deaths", ascending=False).reset_index(drop=True)
+
+
+def old_summary_stats(df, disease, year):
+    data = old_map_data(df, disease, year)
+    return {
+        "total": int(data["Deaths"].sum()),
+        "mean": int(data["Deaths"].mean()),
+        "max_country": data.loc[data["Deaths"].idxmax(), "Country"],
+        "max_deaths": int(data["Deaths"].max()),
+    }
+
+
+@pytest.fixture(scope="module", autouse=True)
+def in_hw3_folder():
+    """api_layer reads DATA_PATH / ARROW_PATH from the working directory."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.chdir(os.path.dirname(os.path.abspath(__file__)))
+        yield
+
+
+@pytest.fixture(scope="module")
+def df():
+    return api.load_data()
+
+
+@pytest.mark.parametrize("disease", api.DISEASES)
+def test_year_queries_match_reference(df, disease):
+    """Map, top-N and summary queries equal the boolean-mask versions for every year"""
+    for year in api.get_years() + [1900]:
+        pd.testing.assert_frame_equal(api.get_map_data(disease, year), old_map_data(df, disease, year))
+        for n in (1, 10, 500):
+            pd.testing.assert_frame_equal(api.get_top_countries(disease, year, n),
+                                          old_top_countries(df, disease, year, n))
+        if year != 1900:
+            assert api.get_summary_stats(disease, year) == old_summary_stats(df, disease, year)
+
+
+def test_trend_and_breakdown_match_reference(df):
+    """Trend and breakdown queries equal the boolean-mask versions, including unknown names"""
+    countries = api.get_countries()
+    selections = [[], ["Nigeria"], ["India", "Chile", "Nigeria"], ["Chile", "Chile", "Atlantis"],
+                  countries[::7], countries]
+    for disease in api.DISEASES[::5]:
+        for selection in selections:
+            pd.testing.assert_frame_equal(api.get_trend_data(disease, selection),
+                                          old_trend_data(df, disease, selection))
+    for country in countries[::11] + ["Atlantis"]:
+        for year in api.get_years()[::6] + [1900]:
+            pd.testing.assert_frame_equal(api.get_disease_breakdown(country, year),
+                                          old_disease_breakdown(df, country, year))
+
+
+def test_raw_page_sorts_stably_both_ways(df):
+    """Descending pages list tied rows in file order, like ascending ones"""
+    for sort_by, country in [("Year", "All"), ("Country", "All"), ("Malaria", "All"), ("Malaria", "Chile")]:
+        rows = df if country == "All" else df[df["Country"] == country]
+        for ascending in (True, False):
+            expected = rows.sort_values(sort_by, ascending=ascending, kind="stable")
+            pages = [api.get_raw_page(country, "All", page, 500, sort_by, ascending)[0]
+                     for page in range(1, len(rows) // 500 + 2)]
+            assert pd.concat(pages).index.tolist() == expected.index.tolist()
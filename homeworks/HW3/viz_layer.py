@@ -1,3 +1,5 @@
+import base64
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
@@ -30,6 +32,71 @@ def make_choropleth(map_df: pd.DataFrame, disease: str, year: int):
     return fig
 
 
+def make_animated_choropleth(all_years_df: pd.DataFrame, disease: str):
+    """
+    Animated choropleth: the geo base figure is built once and each year is a
+    frame holding only that year's color values. Countries missing in a year
+    get a null value and are left unfilled.
+    """
+    wide = all_years_df.pivot_table(index="Year", columns="Code", values="Deaths",
+                                    aggfunc="first", observed=True)
+    codes = wide.columns.astype(str).tolist()
+    names = all_years_df.drop_duplicates("Code").set_index("Code")["Country"]
+    hover = [str(names[code]) for code in wide.columns]
+    z = wide.to_numpy(dtype=float)
+    years = wide.index.astype(str).tolist()
+
+    fig = go.Figure(
+        data=[go.Choropleth(locations=codes, z=z[0], text=hover, coloraxis="coloraxis",
+                            hovertemplate="<b>%{text}</b><br>Deaths: %{z:,}<extra></extra>")],
+        frames=[go.Frame(name=year, data=[go.Choropleth(z=z[i])]) for i, year in enumerate(years)],)
+    fig.update_layout(
+        title=f"<b>{disease}</b> — Deaths Worldwide ({years[0]}–{years[-1]})",
+        paper_bgcolor=BG_COLOR,
+        geo=dict(bgcolor=BG_COLOR, showframe=False, showcoastlines=True),
+        coloraxis=dict(colorscale="Reds", cmin=float(np.nanmin(z)), cmax=float(np.nanmax(z)),
+                       colorbar=dict(title="Deaths")),
+        margin=dict(l=0, r=0, t=50, b=0),
+        font=dict(color=FONT_COLOR),
+        title_font_size=16,
+        updatemenus=[dict(
+            type="buttons", showactive=False, x=0.05, y=0.05, xanchor="right", yanchor="top",
+            buttons=[
+                dict(label="▶", method="animate",
+                     args=[None, dict(frame=dict(duration=300, redraw=True), fromcurrent=True)]),
+                dict(label="❚❚", method="animate",
+                     args=[[None], dict(frame=dict(duration=0, redraw=False), mode="immediate")]),
+            ],)],
+        sliders=[dict(
+            active=0, x=0.1, len=0.9, currentvalue=dict(prefix="Year: "),
+            steps=[dict(label=year, method="animate",
+                        args=[[year], dict(frame=dict(duration=0, redraw=True), mode="immediate")])
+                   for year in years],)],)
+    return fig
+
+
+def _as_array(values) -> np.ndarray:
+    """Decode a serialized Plotly array (plain list or base64 typed array)."""
+    if isinstance(values, dict) and "bdata" in values:
+        return np.frombuffer(base64.b64decode(values["bdata"]), dtype=values["dtype"])
+    return np.asarray(values, dtype=float)
+
+
+def select_frame(animated_fig: dict, disease: str, year: int) -> dict:
+    """
+    Static single-year figure cut from a serialized animated choropleth.
+    Only the color values are swapped in; the geo base is reused as-is.
+    """
+    frames = {frame["name"]: frame for frame in animated_fig["frames"]}
+    z = frames[str(year)]["data"][0]["z"]
+    values = _as_array(z)
+    layout = {k: v for k, v in animated_fig["layout"].items() if k not in ("sliders", "updatemenus")}
+    layout["title"] = {**layout["title"], "text": f"<b>{disease}</b> — Deaths Worldwide ({year})"}
+    layout["coloraxis"] = {**layout["coloraxis"], "cmin": float(np.nanmin(values)),
+                          "cmax": float(np.nanmax(values))}
+    return {"data": [{**animated_fig["data"][0], "z": z}], "layout": layout}
+
+
 # Tab 2: Trend Line Chart
 
 def make_trend_chart(trend_df: pd.DataFrame, disease: str, countries: list):
@@ -1,10 +1,28 @@
+import os
 import pandas as pd
 import requests
-import io
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
 from pathlib import Path
-
-CACHE_FILE = Path("orange_line_feb2026.parquet")
+# stage instrumentation is shared by every project (shared/instrument.py) and optional
+try:
+    from instrument import instrument
+except ImportError:   # shared/ is not on the path: stages run uninstrumented
+    def instrument(name=None):
+        return lambda func: func
+
+CACHE_DIR = Path("lamp_cache")   # one parquet file per route and service day
 TRUNK_ROUTE_ID = "Orange"
+START_DATE = date(2026, 2, 1)
+END_DATE = date(2026, 2, 28)
+MAX_WORKERS = 6                  # concurrent day downloads
+BASE_URL = ("https://performancedata.mbta.com/lamp/subway-on-time-performance-v1/"
+            "{date}-subway-on-time-performance-v1.parquet")
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+                  "AppleWebKit/537.36 (KHTML, like Gecko) "
+                  "Chrome/120.0.0.0 Safari/537.36"
+}
 
 ORANGE_LINE_STOPS = [
     "place-ogmnl",  # Oak Grove
@@ -30,37 +48,84 @@ ORANGE_LINE_STOPS = [
 ]
 
 
-def fetch_data(trunk_route_id: str = TRUNK_ROUTE_ID) -> pd.DataFrame:
-    if CACHE_FILE.exists():
-        print("Loading from cache...")
-        return pd.read_parquet(CACHE_FILE)
-
-    base_url = "https://performancedata.mbta.com/lamp/subway-on-time-performance-v1/2026-02-{day:02d}-subway-on-time-performance-v1.parquet"
+def service_days(start: date, end: date) -> list[date]:
+    """Every day from start to end, inclusive."""
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
 
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                      "AppleWebKit/537.36 (KHTML, like Gecko) "
-                      "Chrome/120.0.0.0 Safari/537.36"
-    }
 
-    frames = []
-    for day in range(1, 29):
-        url = base_url.format(day=day)
-        print(f"Fetching day {day}...")
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            df = pd.read_parquet(io.BytesIO(response.content))
-            df = df[df["trunk_route_id"] == trunk_route_id]
-            frames.append(df)
-        except Exception as e:
-            print(f"  Skipped day {day}: {e}")
+def day_cache_path(cache_dir: Path, trunk_route_id: str, day: date) -> Path:
+    return Path(cache_dir) / trunk_route_id / f"{day.isoformat()}.parquet"
 
-    combined = pd.concat(frames, ignore_index=True)
-    combined.to_parquet(CACHE_FILE)
-    print(f"Cached to {CACHE_FILE}")
-    return combined
 
+def fetch_day(session: requests.Session, day: date, trunk_route_id: str = TRUNK_ROUTE_ID,
+              base_url: str = BASE_URL, cache_dir: Path = CACHE_DIR) -> Path:
+    """
+    Download one day's LAMP file and cache only the rows of trunk_route_id.
+    The file is streamed to disk instead of held in memory, and only the
+    route's rows are read back out of it. The cache file is written under
+    a temporary name and renamed, so an interrupted run never leaves a
+    half-written day behind.
+    """
+    path = day_cache_path(cache_dir, trunk_route_id, day)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    download = path.with_suffix(".download")
+    partial = path.with_suffix(".partial")
+    try:
+        with session.get(base_url.format(date=day.isoformat()), stream=True, timeout=60) as response:
+            response.raise_for_status()
+            with open(download, "wb") as f:
+                for block in response.iter_content(chunk_size=1 << 20):
+                    f.write(block)
+        df = pd.read_parquet(download, filters=[("trunk_route_id", "==", trunk_route_id)])
+        df.to_parquet(partial)
+        os.replace(partial, path)
+    finally:
+        download.unlink(missing_ok=True)
+        partial.unlink(missing_ok=True)
+    return path
+
+
+@instrument()
+def fetch_data(trunk_route_id: str = TRUNK_ROUTE_ID, start: date = START_DATE, end: date = END_DATE,
+               base_url: str = BASE_URL, cache_dir: Path = CACHE_DIR,
+               max_workers: int = MAX_WORKERS) -> pd.DataFrame:
+    """
+    Load LAMP on-time performance rows for one route from start to end.
+    Days already in the per-day cache are read from disk; the missing ones
+    are downloaded concurrently by a pool of max_workers threads. Each day
+    is cached as soon as it arrives, so a rerun after an interruption (or
+    a failed day) only fetches what is still missing.
+    """
+    days = service_days(start, end)
+    missing = [day for day in days if not day_cache_path(cache_dir, trunk_route_id, day).exists()]
+    if len(missing) < len(days):
+        print(f"Loading {len(days) - len(missing)} cached day(s)...")
+
+    if missing:
+        session = requests.Session()
+        session.headers.update(HEADERS)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        with session, ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(fetch_day, session, day, trunk_route_id, base_url, cache_dir): day
+                       for day in missing}
+            for future in as_completed(futures):
+                day = futures[future]
+                try:
+                    future.result()
+                    print(f"Fetched {day}")
+                except Exception as e:
+                    print(f"  Skipped day {day}: {e}")
+
+    frames = [pd.read_parquet(path) for path in
+              (day_cache_path(cache_dir, trunk_route_id, day) for day in days) if path.exists()]
+    if not frames:
+        return pd.DataFrame()
+    print(f"Cached in {Path(cache_dir) / trunk_route_id}")
+    return pd.concat(frames, ignore_index=True)
+
+@instrument()
 def clean_data(df: pd.DataFrame) -> pd.DataFrame:
     """Clean and deduplicate the raw LAMP dataframe."""
 
@@ -76,6 +141,7 @@ def clean_data(df: pd.DataFrame) -> pd.DataFrame:
     return df.reset_index(drop=True)
 
 
+@instrument()
 def get_trip_durations(df: pd.DataFrame) -> pd.DataFrame:
     """Compute end-to-end trip duration by summing segment travel times."""
     trip_durations = (
@@ -0,0 +1,99 @@
+import threading
+import time
+from datetime import date
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+import pandas as pd
+import pytest
+from acquire import fetch_data, service_days, day_cache_path
+
+FILE_NAME = "{date}-subway-on-time-performance-v1.parquet"
+DAYS = service_days(date(2026, 2, 1), date(2026, 2, 5))
+
+
+def write_day(folder, day):
+    """A small LAMP file with Orange and Red line rows for one service day."""
+    pd.DataFrame({
+        "trunk_route_id": ["Orange", "Red", "Orange"],
+        "trip_id": [f"{day}-1", f"{day}-2", f"{day}-3"],
+        "service_date": [int(day.strftime("%Y%m%d"))] * 3,
+        "travel_time_seconds": [120.0, 90.0, 150.0],
+    }).to_parquet(folder / FILE_NAME.format(date=day.isoformat()))
+
+
+@pytest.fixture
+def lamp_server(tmp_path):
+    """Local file server for LAMP day files; yields (base_url, served folder, request stats)."""
+    served = tmp_path / "served"
+    served.mkdir()
+    for day in DAYS:
+        write_day(served, day)
+    stats = {"requests": [], "active": 0, "max_active": 0}
+    lock = threading.Lock()
+
+    class Handler(SimpleHTTPRequestHandler):
+        def do_GET(self):
+            with lock:
+                stats["requests"].append(self.path)
+                stats["active"] += 1
+                stats["max_active"] = max(stats["max_active"], stats["active"])
+            try:
+                time.sleep(0.02)  # keep requests overlapping
+                super().do_GET()
+            finally:
+                with lock:
+                    stats["active"] -= 1
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(Handler, directory=str(served)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/{FILE_NAME}", served, stats
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_data_downloads_date_range(lamp_server, tmp_path):
+    """Every day in the range is fetched in parallel, filtered to the route and cached per day"""
+    base_url, _, stats = lamp_server
+    cache_dir = tmp_path / "cache"
+    df = fetch_data("Orange", DAYS[0], DAYS[-1], base_url=base_url, cache_dir=cache_dir, max_workers=3)
+
+    assert len(df) == 2 * len(DAYS)
+    assert set(df["trunk_route_id"]) == {"Orange"}
+    assert sorted(df["service_date"].unique()) == [int(d.strftime("%Y%m%d")) for d in DAYS]
+    assert all(day_cache_path(cache_dir, "Orange", day).exists() for day in DAYS)
+    assert len(stats["requests"]) == len(DAYS)
+    assert 1 < stats["max_active"] <= 3, "Downloads should overlap within the pool size"
+
+
+def test_fetch_data_resumes_missing_days(lamp_server, tmp_path):
+    """A rerun only downloads days that are not cached yet"""
+    base_url, _, stats = lamp_server
+    cache_dir = tmp_path / "cache"
+    fetch_data("Orange", DAYS[0], DAYS[-1], base_url=base_url, cache_dir=cache_dir)
+    day_cache_path(cache_dir, "Orange", DAYS[2]).unlink()  # as if the run was cut off
+    stats["requests"].clear()
+
+    df = fetch_data("Orange", DAYS[0], DAYS[-1], base_url=base_url, cache_dir=cache_dir)
+
+    assert stats["requests"] == ["/" + FILE_NAME.format(date=DAYS[2].isoformat())]
+    assert len(df) == 2 * len(DAYS)
+
+
+def test_fetch_data_skips_then_retries_unavailable_days(lamp_server, tmp_path):
+    """A day the server does not have yet is skipped, not cached, and fetched on the next run"""
+    base_url, served, _ = lamp_server
+    cache_dir = tmp_path / "cache"
+    (served / FILE_NAME.format(date=DAYS[1].isoformat())).unlink()
+
+    df = fetch_data("Orange", DAYS[0], DAYS[-1], base_url=base_url, cache_dir=cache_dir)
+    assert len(df) == 2 * (len(DAYS) - 1)
+    assert not day_cache_path(cache_dir, "Orange", DAYS[1]).exists()
+    assert not list((cache_dir / "Orange").glob("*.download")), "No partial files left behind"
+
+    write_day(served, DAYS[1])
+    df = fetch_data("Orange", DAYS[0], DAYS[-1], base_url=base_url, cache_dir=cache_dir)
+    assert len(df) == 2 * len(DAYS)
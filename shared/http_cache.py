@@ -0,0 +1,183 @@
+"""
+On-disk HTTP response cache
+Stores GET responses in a small SQLite file, keyed by URL + query params,
+so re-running a pipeline does not hit the API (or its rate limit) again.
+- TTL: entries younger than `ttl` seconds are served without any request.
+- Revalidation: older entries that came with an ETag / Last-Modified are
+  re-checked with If-None-Match / If-Modified-Since; a 304 just refreshes them.
+- Offline: if the request fails, a stale entry is served instead.
+- Size bound: least recently used entries are evicted past `max_bytes`.
+Only 200 responses are cached. The SQLite file is created on first use,
+so a module-level ResponseCache() costs nothing until a request is made.
+One instance can be shared by threads; writes and counters are locked.
+One copy shared by code/ and HW2, imported only if this folder is on the
+path (like instrument.py); without it they send every request uncached.
+"""
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+DEFAULT_PATH = "http_cache.sqlite"
+DEFAULT_TTL = 24 * 60 * 60          # 1 day
+DEFAULT_MAX_BYTES = 200 * 1024 ** 2  # 200 MB
+
+
+class ResponseCache:
+    def __init__(self, path=DEFAULT_PATH, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = str(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def _create_table(self, db):
+        db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                headers TEXT,
+                body BLOB,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL,
+                accessed_at REAL,
+                size INTEGER)""")
+
+    @contextmanager
+    def _connect(self):
+        """SQLite connection that commits on success and is always closed; creates the file on first use."""
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            with db:
+                if not self._ready:
+                    self._create_table(db)   # IF NOT EXISTS: harmless if two threads race here
+                    self._ready = True
+                yield db
+        finally:
+            db.close()
+
+    @staticmethod
+    def make_key(url, params=None):
+        """Full request URL with the query params in sorted order."""
+        params = params or {}
+        items = sorted(params.items() if isinstance(params, dict) else params)
+        return requests.Request("GET", url, params=items).prepare().url
+
+    def get(self, url, params=None, headers=None, timeout=30, session=None):
+        """
+        Cached drop-in for requests.get(url, params=params, headers=headers).
+        Returns a requests.Response; `response.from_cache` tells whether the
+        body came from disk.
+        """
+        key = self.make_key(url, params)
+        entry = self._load(key)
+        now = time.time()
+
+        if entry is not None and now - entry["fetched_at"] < self.ttl:
+            with self._lock:
+                self.hits += 1
+            self._touch(key, now)
+            return self._to_response(entry, key)
+
+        request_headers = dict(headers or {})
+        if entry is not None:
+            if entry["etag"]:
+                request_headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                request_headers["If-Modified-Since"] = entry["last_modified"]
+
+        getter = session.get if session is not None else requests.get
+        try:
+            response = getter(url, params=params, headers=request_headers, timeout=timeout)
+        except requests.exceptions.RequestException:
+            if entry is None:
+                raise
+            # offline: a stale copy beats no data
+            with self._lock:
+                self.hits += 1
+            return self._to_response(entry, key)
+
+        if response.status_code == 304 and entry is not None:
+            with self._lock:
+                self.revalidated += 1
+            self._refresh(key, now)
+            return self._to_response(entry, key)
+
+        with self._lock:
+            self.misses += 1
+        if response.status_code == 200:
+            self._store(key, url, response, now)
+        response.from_cache = False
+        return response
+
+    def _load(self, key):
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT headers, body, etag, last_modified, fetched_at FROM responses WHERE key = ?",
+                (key,)).fetchone()
+        if row is None:
+            return None
+        return {"headers": json.loads(row[0]), "body": row[1], "etag": row[2],
+                "last_modified": row[3], "fetched_at": row[4]}
+
+    def _store(self, key, url, response, now):
+        body = response.content
+        with self._lock, self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, json.dumps(dict(response.headers)), body,
+                 response.headers.get("ETag"), response.headers.get("Last-Modified"),
+                 now, now, len(body)))
+            self._evict(db)
+
+    def _touch(self, key, now):
+        with self._lock, self._connect() as db:
+            db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+
+    def _refresh(self, key, now):
+        with self._lock, self._connect() as db:
+            db.execute("UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE key = ?",
+                       (now, now, key))
+
+    def _evict(self, db):
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in db.execute(
+                "SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    @staticmethod
+    def _to_response(entry, key):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = entry["body"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.url = key
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.from_cache = True
+        return response
+
+    def stats(self):
+        with self._connect() as db:
+            entries, size = db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        with self._lock:
+            counts = {"hits": self.hits, "misses": self.misses, "revalidated": self.revalidated}
+        return {**counts, "entries": entries, "bytes": size}
+
+    def clear(self):
+        with self._lock, self._connect() as db:
+            db.execute("DELETE FROM responses")
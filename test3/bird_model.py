@@ -1,7 +1,11 @@
 """
-Pydantic model for bird occurrence observations.
+Pydantic model for bird occurrence observations, plus an array-backed
+batch of them for the analysis layer.
 DS3500 Practical Exam 3
 """
+import sys
+import numpy as np
+import pandas as pd
 from pydantic import BaseModel, field_validator, computed_field
 from datetime import datetime
 
@@ -79,4 +83,147 @@ class BirdObservation(BaseModel):
 
     def __hash__(self):
         """Bird observations are uniquely identified by their occurrenceID."""
-        return hash(self.occurrenceID)
\ No newline at end of file
+        return hash(self.occurrenceID)
+
+
+SEASONS = ("Winter", "Spring", "Summer", "Fall")
+HEMISPHERES = ("Northern", "Southern")
+# month (1-12) -> index into SEASONS, same mapping as BirdObservation.season
+MONTH_TO_SEASON = np.array([0, 0, 0, 1, 1, 1, 2, 2, 2, 3, 3, 3, 0], dtype=np.int8)
+
+
+class ObservationBatch:
+    """
+    Column-oriented collection of validated bird observations.
+    Species and country are stored as int32 codes into small label arrays,
+    dates as int64 nanoseconds, counts as int32, and season/hemisphere as
+    int8 codes computed once, so filtering and summarizing are NumPy mask
+    and bincount calls instead of loops over pydantic objects.
+    Single observations are built as BirdObservation objects only on access.
+    """
+
+    def __init__(self, occurrence_id, species_codes, species_names, latitude, longitude,
+                 event_date, country_codes, country_names, count):
+        self.occurrence_id = occurrence_id
+        self.species_codes = species_codes
+        self.species_names = species_names
+        self.latitude = latitude
+        self.longitude = longitude
+        self.event_date = event_date
+        self.country_codes = country_codes
+        self.country_names = country_names
+        self.count = count
+        self.season_codes = MONTH_TO_SEASON[self.month]
+        self.hemisphere_codes = (latitude < 0).astype(np.int8)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "ObservationBatch":
+        """Build a batch from rows that passed bird_pipeline.validate_batch."""
+        species_codes, species_names = pd.factorize(df["species"])
+        country_codes, country_names = pd.factorize(df["country"])
+        if "occurrenceID" in df.columns:
+            occurrence_id = df["occurrenceID"].to_numpy(dtype=object)
+        else:
+            occurrence_id = np.full(len(df), None, dtype=object)
+        return cls(
+            occurrence_id=occurrence_id,
+            species_codes=species_codes.astype(np.int32),
+            species_names=np.asarray(species_names, dtype=object),
+            latitude=df["latitude"].to_numpy(dtype=np.float64),
+            longitude=df["longitude"].to_numpy(dtype=np.float64),
+            event_date=pd.to_datetime(df["event_date"]).to_numpy(dtype="datetime64[ns]").view(np.int64),
+            country_codes=country_codes.astype(np.int32),
+            country_names=np.asarray(country_names, dtype=object),
+            count=df["count"].to_numpy().astype(np.int32),
+        )
+
+    @classmethod
+    def from_observations(cls, observations: list) -> "ObservationBatch":
+        """Build a batch from a list of BirdObservation objects."""
+        return cls.from_frame(pd.DataFrame({
+            "occurrenceID": pd.Series([o.occurrenceID for o in observations], dtype=object),
+            "species": pd.Series([o.species for o in observations], dtype=object),
+            "latitude": [o.latitude for o in observations],
+            "longitude": [o.longitude for o in observations],
+            "event_date": pd.to_datetime([o.event_date for o in observations]),
+            "country": pd.Series([o.country for o in observations], dtype=object),
+            "count": np.array([o.count for o in observations], dtype=np.int64),
+        }))
+
+    def __len__(self):
+        return len(self.count)
+
+    def __getitem__(self, i: int) -> BirdObservation:
+        """Materialize observation i (its fields were validated when the batch was built)."""
+        return BirdObservation.model_construct(
+            occurrenceID=self.occurrence_id[i],
+            species=self.species_names[self.species_codes[i]],
+            latitude=float(self.latitude[i]),
+            longitude=float(self.longitude[i]),
+            event_date=pd.Timestamp(int(self.event_date[i])),
+            country=self.country_names[self.country_codes[i]],
+            count=int(self.count[i]),
+        )
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def to_observations(self) -> list:
+        return list(self)
+
+    @property
+    def month(self) -> np.ndarray:
+        return self.event_date.astype("datetime64[ns]").astype("datetime64[M]").astype(np.int64) % 12 + 1
+
+    @property
+    def year(self) -> np.ndarray:
+        return self.event_date.astype("datetime64[ns]").astype("datetime64[Y]").astype(np.int64) + 1970
+
+    @property
+    def season(self) -> np.ndarray:
+        return np.asarray(SEASONS, dtype=object)[self.season_codes]
+
+    @property
+    def hemisphere(self) -> np.ndarray:
+        return np.asarray(HEMISPHERES, dtype=object)[self.hemisphere_codes]
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the per-observation arrays (occurrence ID strings included)."""
+        arrays = [self.species_codes, self.latitude, self.longitude, self.event_date,
+                  self.country_codes, self.count, self.season_codes, self.hemisphere_codes,
+                  self.occurrence_id]
+        ids = sum(sys.getsizeof(v) for v in self.occurrence_id if v is not None)
+        return sum(a.nbytes for a in arrays) + ids
+
+    def take(self, index) -> "ObservationBatch":
+        """Sub-batch of the rows selected by a boolean mask or an index array."""
+        return ObservationBatch(
+            occurrence_id=self.occurrence_id[index],
+            species_codes=self.species_codes[index],
+            species_names=self.species_names,
+            latitude=self.latitude[index],
+            longitude=self.longitude[index],
+            event_date=self.event_date[index],
+            country_codes=self.country_codes[index],
+            country_names=self.country_names,
+            count=self.count[index],
+        )
+
+    def filter(self, min_count: int = 1, seasons=None, countries=None) -> "ObservationBatch":
+        """Observations with count >= min_count, in the given seasons and countries."""
+        mask = self.count >= min_count
+        if seasons is not None:
+            mask &= np.isin(self.season_codes, [SEASONS.index(s) for s in seasons if s in SEASONS])
+        if countries is not None:
+            wanted = [i for i, name in enumerate(self.country_names) if name in countries]
+            mask &= np.isin(self.country_codes, wanted)
+        return self.take(mask)
+
+    def totals_by_species(self) -> dict:
+        """Total count per species, largest first (ties in order of first appearance)."""
+        totals = np.bincount(self.species_codes, weights=self.count, minlength=len(self.species_names))
+        present, first = np.unique(self.species_codes, return_index=True)
+        present = present[np.argsort(first)]
+        present = present[np.argsort(-totals[present], kind="stable")]
+        return {self.species_names[code]: int(totals[code]) for code in present}
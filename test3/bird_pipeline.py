@@ -3,21 +3,91 @@ pipeline.py
 Data pipeline and simulation for bird occurrence observations.
 DS3500 Practical Exam 3
 """
+import itertools
+import os
+import numpy as np
 import pandas as pd
-from collections import defaultdict
-from pydantic import ValidationError
-from bird_model import BirdObservation
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from pandas.tseries.api import guess_datetime_format
+from typing import NamedTuple
+from bird_model import BirdObservation, ObservationBatch
+# stage instrumentation is shared by every project (shared/instrument.py) and optional
+try:
+    from instrument import instrument
+except ImportError:   # shared/ is not on the path: stages run uninstrumented
+    def instrument(name=None):
+        return lambda func: func
 
 # ── Data Layer ────────────────────────────────────────────────────────────────
 
-def load_data(path: str) -> pd.DataFrame:
+# raw GBIF columns the pipeline uses, read with fixed dtypes (everything else is skipped);
+# numbers are read as text and parsed in clean_data, so one bad cell rejects its row
+# in validate_batch instead of failing the whole read
+RAW_DTYPES = {
+    "occurrenceID":     "string",
+    "species":          "string",
+    "decimalLatitude":  "str",
+    "decimalLongitude": "str",
+    "eventDate":        "string",
+    "countryCode":      "string",
+    "individualCount":  "str",
+}
+NUMERIC_COLUMNS = ["latitude", "longitude", "count"]
+CHUNK_SIZE = 100_000
+
+def read_chunks(path: str, chunksize: int = CHUNK_SIZE, nrows: int | None = None):
+    """Read the tab-separated GBIF export in chunks, only the RAW_DTYPES columns."""
+    return pd.read_csv(path, sep="\t", usecols=lambda c: c in RAW_DTYPES, dtype=RAW_DTYPES,
+                       chunksize=chunksize, nrows=nrows)
+
+@instrument()
+def load_data(path: str, chunksize: int = CHUNK_SIZE) -> pd.DataFrame:
     """Load bird occurrence CSV into a DataFrame."""
-    df = pd.read_csv(path, sep="\t")
-    cleaned = clean_data(df)
-    return cleaned
+    date_format, chunks = _with_date_format(read_chunks(path, chunksize))
+    cleaned = [clean_data(chunk, date_format) for chunk in chunks]
+    return pd.concat(cleaned, ignore_index=True) if cleaned else clean_data(_empty_raw())
+
+def _empty_raw() -> pd.DataFrame:
+    return pd.DataFrame({c: pd.Series(dtype=t) for c, t in RAW_DTYPES.items()})
+
+def guess_date_format(df: pd.DataFrame) -> str | None:
+    """
+    The eventDate format pandas would infer for the whole column, taken from
+    its first date, so chunks cleaned separately parse dates the same way.
+    None if the chunk has no string date to infer it from.
+    """
+    column = "eventDate" if "eventDate" in df.columns else "event_date"
+    dates = df[column].dropna() if column in df.columns else []
+    if len(dates) == 0 or not isinstance(dates.iloc[0], str):
+        return None
+    return guess_datetime_format(dates.iloc[0]) or "mixed"
+
+def _with_date_format(chunks):
+    """Find the date format in the first chunk that has a date; return it and all the chunks."""
+    seen = []
+    date_format = None
+    for chunk in chunks:
+        seen.append(chunk)
+        date_format = guess_date_format(chunk)
+        if date_format is not None:
+            break
+    return date_format, itertools.chain(seen, chunks)
 
-def clean_data(df: pd.DataFrame) -> pd.DataFrame:
-    """Clean and normalize the raw DataFrame."""
+def _parse_numbers(col: pd.Series) -> pd.Series:
+    """
+    Numeric column as float64. If some cells are not numbers, they are kept
+    as they were (in an object column) for validate_batch to reject.
+    """
+    if pd.api.types.is_numeric_dtype(col):
+        return col
+    value = pd.to_numeric(col, errors="coerce")
+    bad = value.isna() & col.notna()
+    return value.astype(object).where(~bad, col) if bad.any() else value
+
+@instrument()
+def clean_data(df: pd.DataFrame, date_format: str | None = None) -> pd.DataFrame:
+    """Clean and normalize the raw DataFrame (date_format: see guess_date_format)."""
     df = df.rename(columns={
         "occurrenceID":    "occurrenceID",
         "species":         "species",
@@ -29,28 +99,127 @@ def clean_data(df: pd.DataFrame) -> pd.DataFrame:
     })
     keep = ["occurrenceID", "species", "latitude", "longitude", "event_date", "country", "count"]
     df = df[[c for c in keep if c in df.columns]].copy()
-    df["event_date"] = pd.to_datetime(df["event_date"], errors="coerce")
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = _parse_numbers(df[col])
+    df["event_date"] = pd.to_datetime(df["event_date"], errors="coerce", format=date_format)
     df = df.dropna(subset=["species", "latitude", "longitude", "event_date"])
     return df.reset_index(drop=True)
 
+# fields every row must provide; occurrenceID is optional
+REQUIRED_FIELDS = ["species", "latitude", "longitude", "event_date", "country", "count"]
+
+def _is_str(col: pd.Series, allow_none: bool = False) -> np.ndarray:
+    """True where a value passes a pydantic str field (NaN does not)."""
+    if isinstance(col.dtype, pd.StringDtype):
+        return col.notna().to_numpy()
+    return np.fromiter((isinstance(v, str) or (allow_none and v is None) for v in col),
+                       dtype=bool, count=len(col))
+
+def _as_float(col: pd.Series) -> np.ndarray:
+    """Column as floats; values pydantic could not read as a number become NaN."""
+    return pd.to_numeric(col, errors="coerce").to_numpy(dtype=float)
+
+@instrument()
+def validate_batch(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame, dict]:
+    """
+    Check every row against the BirdObservation rules at once, as vectorized
+    masks over the columns instead of one pydantic model per row.
+    Returns (accepted, rejected, error_counts), where error_counts maps each
+    field to the number of rows failing it. The accepted and rejected rows
+    are the ones BirdObservation(**row) would accept and reject.
+    """
+    n = len(df)
+    failures = {field: np.ones(n, dtype=bool) for field in REQUIRED_FIELDS if field not in df.columns}
+
+    if "occurrenceID" in df.columns:
+        failures["occurrenceID"] = ~_is_str(df["occurrenceID"], allow_none=True)
+    for field in ("species", "country"):
+        if field in df.columns:
+            failures[field] = ~_is_str(df[field])
+    for field, limit in (("latitude", 90), ("longitude", 180)):
+        if field in df.columns:
+            value = _as_float(df[field])
+            failures[field] = ~((value >= -limit) & (value <= limit))   # NaN fails too
+    if "event_date" in df.columns and not pd.api.types.is_datetime64_any_dtype(df["event_date"]):
+        failures["event_date"] = pd.to_datetime(df["event_date"], errors="coerce").isna().to_numpy()
+    if "count" in df.columns:
+        count = _as_float(df["count"])
+        failures["count"] = ~(np.isfinite(count) & (count == np.floor(count)) & (count >= 1))
+
+    valid = np.ones(n, dtype=bool)
+    for mask in failures.values():
+        valid &= ~mask
+    error_counts = {field: int(mask.sum()) for field, mask in failures.items() if mask.any()}
+    return df[valid], df[~valid], error_counts
+
+def to_observations(accepted: pd.DataFrame) -> list:
+    """Build BirdObservation objects from rows that already passed validate_batch."""
+    fields = [f for f in BirdObservation.model_fields if f in accepted.columns]
+    types = {"count": int, "latitude": float, "longitude": float}
+    records = accepted[fields].astype({f: t for f, t in types.items() if f in fields})
+    # the rows are known valid, so skip pydantic validation
+    return [BirdObservation.model_construct(**record) for record in records.to_dict("records")]
+
+@instrument()
+def build_batch(df: pd.DataFrame) -> ObservationBatch:
+    """Validate cleaned DataFrame rows into an array-backed ObservationBatch."""
+    accepted, rejected, _ = validate_batch(df)
+    if len(rejected):
+        print(f"Skipped {len(rejected)} observations due to Validation Errors.")
+    return ObservationBatch.from_frame(accepted)
+
+@instrument()
 def build_observations(df: pd.DataFrame) -> list:
     """Convert cleaned DataFrame rows into validated BirdObservation objects."""
-    observations = []
-    validation_errors = 0
-    for _, row in df.iterrows():
-        try:
-            obs = BirdObservation(**row)
-            observations.append(obs)
-        except ValidationError:
-            validation_errors += 1
-            continue
-    if validation_errors:
-        print(f"Skipped {validation_errors} observations due to Validation Errors.")
+    accepted, rejected, _ = validate_batch(df)
+    observations = to_observations(accepted)
+    if len(rejected):
+        print(f"Skipped {len(rejected)} observations due to Validation Errors.")
     return observations
 
+def _clean_and_validate(chunk: pd.DataFrame, date_format: str | None):
+    """Worker task: clean and validate one raw chunk; return the accepted rows and the number rejected."""
+    accepted, rejected, _ = validate_batch(clean_data(chunk, date_format))
+    return accepted, len(rejected)
+
+def _ordered_results(pool, chunks, date_format, window: int):
+    """Run chunks through the pool, at most `window` in flight, yielding results in input order."""
+    pending = deque()
+    for chunk in chunks:
+        pending.append(pool.submit(_clean_and_validate, chunk, date_format))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+@instrument()
+def load_batch(path: str, workers: int = 1, chunksize: int = CHUNK_SIZE,
+               nrows: int | None = None) -> ObservationBatch:
+    """
+    Chunked load -> clean -> validate pipeline for large GBIF exports.
+    Chunks are read with only the needed columns, cleaned and validated
+    across `workers` processes, and merged back in file order, so the
+    result is the same as build_batch(load_data(path)).
+    """
+    date_format, chunks = _with_date_format(read_chunks(path, chunksize, nrows))
+
+    if workers <= 1:
+        results = [_clean_and_validate(chunk, date_format) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(_ordered_results(pool, chunks, date_format, window=2 * workers))
+
+    skipped = sum(rejected for _, rejected in results)
+    if skipped:
+        print(f"Skipped {skipped} observations due to Validation Errors.")
+    accepted = [accepted for accepted, _ in results] or [clean_data(_empty_raw())]
+    return ObservationBatch.from_frame(pd.concat(accepted, ignore_index=True))
+
 # ── Analysis Layer ────────────────────────────────────────────────────────────
+@instrument()
 def filter_observations(observations, min_count=1, seasons=None, countries=None):
-    """Filter observations by count, season, and/or country."""
+    """Filter observations (a list or an ObservationBatch) by count, season, and/or country."""
     if not isinstance(min_count, int):
         raise TypeError("min_count must be an integer")
     if min_count < 0:
@@ -60,6 +229,8 @@ def filter_observations(observations, min_count=1, seasons=None, countries=None)
     if countries is not None and not isinstance(countries, list):
         raise TypeError("countries must be a list")
 
+    if isinstance(observations, ObservationBatch):
+        return observations.filter(min_count, seasons, countries)
     return [
         obs for obs in observations
         if obs.count >= min_count
@@ -67,8 +238,11 @@ def filter_observations(observations, min_count=1, seasons=None, countries=None)
            and (countries is None or obs.country in countries)
     ]
 
+@instrument()
 def summarize_by_species(observations: list) -> dict:
     """Return total count per species across all observations."""
+    if isinstance(observations, ObservationBatch):
+        return observations.totals_by_species()
     totals = defaultdict(int)
     for obs in observations:
         totals[obs.species] += obs.count
@@ -76,44 +250,144 @@ def summarize_by_species(observations: list) -> dict:
 
 # ── Simulation Layer ──────────────────────────────────────────────────────────
 ######## YOU MAY IGNORE CODE IN THIS LAYER FOR THE EXAM ########
-def run_simulation(observations: list, top_n: int = 5) -> None:
+class TopKTally:
     """
-    Simulate bird sightings arriving in chronological order.
-    Prints a running tally of the top N species after each month.
+    Running totals per species with the top k kept in an indexed min-heap.
+    Totals only grow, so every species outside the heap is never ahead of
+    the heap's root; an update is O(log k) instead of re-sorting all species.
+    Ties rank the species seen first higher, as a stable sort of the
+    running totals would.
     """
-    sorted_obs = sorted(observations, key=lambda o: o.event_date)
-    running_totals = defaultdict(int)
-    current_month = None
 
-    for obs in sorted_obs:
-        month_key = (obs.year, obs.event_date.month)
+    def __init__(self, k: int):
+        self.k = k
+        self.totals = {}       # species -> running total, in order first seen
+        self._first_seen = {}  # species -> arrival rank, breaks ties
+        self._heap = []        # top species, worst at index 0
+        self._pos = {}         # species -> index in _heap
+
+    def _key(self, species):
+        return self.totals[species], -self._first_seen[species]
+
+    def _swap(self, i, j):
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self._pos[heap[i]] = i
+        self._pos[heap[j]] = j
+
+    def _sift_up(self, i):
+        while i > 0:
+            parent = (i - 1) // 2
+            if self._key(self._heap[i]) >= self._key(self._heap[parent]):
+                return
+            self._swap(i, parent)
+            i = parent
+
+    def _sift_down(self, i):
+        n = len(self._heap)
+        while True:
+            smallest = i
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < n and self._key(self._heap[child]) < self._key(self._heap[smallest]):
+                    smallest = child
+            if smallest == i:
+                return
+            self._swap(i, smallest)
+            i = smallest
 
-        if current_month is None:
-            current_month = month_key
+    def add(self, species: str, count: int) -> None:
+        """Add count to a species and update the top k."""
+        if species not in self.totals:
+            self.totals[species] = 0
+            self._first_seen[species] = len(self._first_seen)
+        self.totals[species] += count
 
-        if month_key != current_month:
-            # print tally at end of each month
-            top = sorted(running_totals.items(), key=lambda x: x[1], reverse=True)[:top_n]
-            print(f"\n── {current_month[0]}-{current_month[1]:02d} ──")
-            for species, count in top:
-                print(f"  {species:<40} {count:>5}")
-            current_month = month_key
+        if species in self._pos:
+            self._sift_down(self._pos[species])   # its key grew
+        elif len(self._heap) < self.k:
+            self._heap.append(species)
+            self._pos[species] = len(self._heap) - 1
+            self._sift_up(len(self._heap) - 1)
+        elif self.k and self._key(species) > self._key(self._heap[0]):
+            del self._pos[self._heap[0]]
+            self._heap[0] = species
+            self._pos[species] = 0
+            self._sift_down(0)
+
+    def top(self) -> list:
+        """The top k (species, total) pairs, largest first."""
+        ranked = sorted(self._heap, key=self._key, reverse=True)
+        return [(species, self.totals[species]) for species in ranked]
+
+
+class MonthlyTally(NamedTuple):
+    """Top species by running total at the end of one month."""
+    year: int
+    month: int
+    top: list
+    final: bool = False
+
+
+def _chronological(observations, presorted: bool = False):
+    """Yield (year, month, species, count) for each observation in date order."""
+    if isinstance(observations, ObservationBatch):
+        order = np.argsort(observations.event_date, kind="stable")
+        yield from zip(observations.year[order].tolist(), observations.month[order].tolist(),
+                       observations.species_names[observations.species_codes[order]].tolist(),
+                       observations.count[order].tolist())
+        return
+    if not presorted:
+        observations = sorted(observations, key=lambda o: o.event_date)
+    for obs in observations:
+        yield obs.year, obs.event_date.month, obs.species, obs.count
 
-        running_totals[obs.species] += obs.count
 
-    # print final month
-    top = sorted(running_totals.items(), key=lambda x: x[1], reverse=True)[:top_n]
-    print(f"\n── {current_month[0]}-{current_month[1]:02d} (final) ──")
-    for species, count in top:
+def iter_monthly_tallies(observations, top_n: int = 5, presorted: bool = False):
+    """
+    Replay observations in chronological order and yield a MonthlyTally at
+    the end of each month (the last one with final=True).
+    observations: a list, an ObservationBatch, or any iterable; pass
+    presorted=True for a stream already in date order (e.g. a generator)
+    so it is consumed lazily instead of sorted first.
+    """
+    tally = TopKTally(top_n)
+    current_month = None
+
+    for year, month, species, count in _chronological(observations, presorted):
+        month_key = (year, month)
+        if current_month is not None and month_key != current_month:
+            yield MonthlyTally(*current_month, tally.top())
+        current_month = month_key
+        tally.add(species, count)
+
+    if current_month is not None:
+        yield MonthlyTally(*current_month, tally.top(), final=True)
+
+
+def print_tally(tally: MonthlyTally) -> None:
+    """Default subscriber: print a month's top species."""
+    suffix = " (final)" if tally.final else ""
+    print(f"\n── {tally.year}-{tally.month:02d}{suffix} ──")
+    for species, count in tally.top:
         print(f"  {species:<40} {count:>5}")
 
+
+def run_simulation(observations, top_n: int = 5, subscribers=None, presorted: bool = False) -> None:
+    """
+    Simulate bird sightings arriving in chronological order.
+    Sends a running tally of the top N species after each month to every
+    subscriber (a callable taking a MonthlyTally); by default it is printed.
+    """
+    subscribers = subscribers or [print_tally]
+    for tally in iter_monthly_tallies(observations, top_n, presorted):
+        for subscriber in subscribers:
+            subscriber(tally)
+
 # ── Main ──────────────────────────────────────────────────────────────────────
 def main():
     CSV_PATH = "gbif_occurrences.csv"
 
-    raw = load_data(CSV_PATH)
-    df = clean_data(raw)
-    observations = build_observations(df)
+    observations = load_batch(CSV_PATH, workers=os.cpu_count() or 1)
 
     print(f"\nLoaded {len(observations)} valid observations.")
 
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the tests check stage records, so load the shared instrumentation (shared/instrument.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
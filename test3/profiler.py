@@ -1,22 +1,50 @@
+import argparse
 import cProfile
 import pstats
 import time
 import pandas as pd
-from bird_pipeline import clean_data, build_observations, filter_observations
+from bird_pipeline import clean_data, build_observations, filter_observations, load_batch, CHUNK_SIZE
 
-def run_pipeline():
-    df = pd.read_csv("gbif_occurrences.csv", sep="\t", nrows=1000)
+CSV_PATH = "gbif_occurrences.csv"
+
+def run_pipeline(path=CSV_PATH):
+    df = pd.read_csv(path, sep="\t", nrows=1000)
     df = clean_data(df)
     obs = build_observations(df)
     filter_observations(obs, min_count=1)
 
-start = time.time()
-run_pipeline()
-end = time.time()
-print(f"Main runtime: {end - start:.3f} seconds")
+def benchmark_workers(path=CSV_PATH, worker_counts=(1, 2, 4), chunksize=CHUNK_SIZE, nrows=None):
+    """Time load_batch (read -> clean -> validate) for each worker count; report rows/sec."""
+    total_rows = sum(len(chunk) for chunk in pd.read_csv(path, sep="\t", usecols=[0],
+                                                         chunksize=chunksize, nrows=nrows))
+    results = []
+    print(f"\n{'workers':>8} {'seconds':>9} {'rows/sec':>12} {'speedup':>8}")
+    for workers in worker_counts:
+        start = time.perf_counter()
+        load_batch(path, workers=workers, chunksize=chunksize, nrows=nrows)
+        elapsed = time.perf_counter() - start
+        results.append({"workers": workers, "seconds": elapsed, "rows_per_sec": total_rows / elapsed})
+        speedup = results[0]["seconds"] / elapsed
+        print(f"{workers:>8} {elapsed:>9.3f} {total_rows / elapsed:>12,.0f} {speedup:>7.2f}x")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profile the bird pipeline and benchmark it across worker counts.")
+    parser.add_argument("--path", default=CSV_PATH)
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--nrows", type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.time()
+    run_pipeline(args.path)
+    end = time.time()
+    print(f"Main runtime: {end - start:.3f} seconds")
+
+    cProfile.run("run_pipeline(args.path)", "output.prof")
 
-cProfile.run("run_pipeline()", "output.prof")
+    p = pstats.Stats("output.prof")
+    p.sort_stats("cumulative")
+    p.print_stats(10)
 
-p = pstats.Stats("output.prof")
-p.sort_stats("cumulative")
-p.print_stats(10)
\ No newline at end of file
+    benchmark_workers(args.path, [int(w) for w in args.workers.split(",")], args.chunksize, args.nrows)
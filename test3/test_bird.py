@@ -2,8 +2,11 @@ import pandas as pd
 import pytest
 from datetime import datetime
 
-from bird_model import BirdObservation
-from bird_pipeline import filter_observations, summarize_by_species, clean_data
+from bird_model import BirdObservation, ObservationBatch
+from bird_pipeline import (filter_observations, summarize_by_species, clean_data,
+                           validate_batch, build_observations, build_batch, load_batch,
+                           TopKTally, run_simulation)
+import instrument   # shared/instrument.py, put on sys.path by conftest.py
 
 
 @pytest.fixture
@@ -19,6 +22,20 @@ def raw_dataframe():
     })
 
 
+@pytest.fixture
+def cleaned_dataframe():
+    """Cleaned DataFrame with one valid row and one row breaking each rule."""
+    return pd.DataFrame({
+        "occurrenceID": ["1", "2", "3", "4", "5"],
+        "species":      ["Puffinus puffinus"] * 5,
+        "latitude":     [42.3, 95.0, 42.3, 42.3, 42.3],
+        "longitude":    [-71.0, -71.0, -190.0, -71.0, -71.0],
+        "event_date":   pd.to_datetime(["2023-06-01"] * 5),
+        "country":      ["US"] * 5,
+        "count":        [2, 1, 1, 0, 2.5],
+    })
+
+
 @pytest.fixture
 def single_observation():
     """A single valid BirdObservation in July (Summer)."""
@@ -79,3 +96,95 @@ def test_summarize_by_species(multi_observation_list):
     result = summarize_by_species(multi_observation_list)
     assert result["Puffinus puffinus"] == 5
     assert result["Fratercula arctica"] == 1
+
+
+def test_validate_batch_matches_model(cleaned_dataframe):
+    """Vectorized validation should accept and reject the same rows as BirdObservation."""
+    accepted, rejected, error_counts = validate_batch(cleaned_dataframe)
+    assert accepted["occurrenceID"].tolist() == ["1"]
+    assert rejected["occurrenceID"].tolist() == ["2", "3", "4", "5"]
+    assert error_counts == {"latitude": 1, "longitude": 1, "count": 2}
+
+
+def test_build_observations_returns_models(cleaned_dataframe):
+    """build_observations should return the same objects pydantic validation builds."""
+    observations = build_observations(cleaned_dataframe)
+    expected = BirdObservation(**cleaned_dataframe.iloc[0])
+    assert observations == [expected]
+    assert observations[0].season == "Summer"
+
+
+def test_batch_filter_matches_list(mixed_count_observations):
+    """ObservationBatch filtering should keep the same observations as the list version."""
+    batch = ObservationBatch.from_observations(mixed_count_observations)
+    result = filter_observations(batch, min_count=2, seasons=["Summer"], countries=["US"])
+    assert list(result) == filter_observations(mixed_count_observations, min_count=2)
+    assert len(filter_observations(batch, seasons=["Winter"])) == 0
+
+
+def test_batch_summarize_by_species(multi_observation_list):
+    """ObservationBatch totals should match the list totals, largest first."""
+    batch = ObservationBatch.from_observations(multi_observation_list)
+    result = summarize_by_species(batch)
+    assert result == {"Puffinus puffinus": 5, "Fratercula arctica": 1}
+    assert list(batch.season) == ["Spring", "Summer", "Summer"]
+
+
+def test_top_k_tally_matches_sort():
+    """TopKTally should rank like a stable sort of the running totals."""
+    tally = TopKTally(2)
+    totals = {}
+    for species, count in [("A", 1), ("B", 2), ("C", 1), ("A", 1), ("C", 3), ("B", 2)]:
+        tally.add(species, count)
+        totals[species] = totals.get(species, 0) + count
+        assert tally.top() == sorted(totals.items(), key=lambda x: x[1], reverse=True)[:2]
+
+
+def test_run_simulation_emits_monthly_events(multi_observation_list):
+    """Subscribers should receive one tally per month, the last one marked final."""
+    events = []
+    run_simulation(multi_observation_list, top_n=1, subscribers=[events.append])
+    assert [(e.month, e.top, e.final) for e in events] == [
+        (5, [("Puffinus puffinus", 3)], False),
+        (6, [("Puffinus puffinus", 5)], False),
+        (7, [("Puffinus puffinus", 5)], True),
+    ]
+
+
+def test_instrumentation_records_stages(raw_dataframe):
+    """Enabled instrumentation should record rows in/out and timing for each stage call."""
+    sink = instrument.MemorySink()
+    instrument.enable(sink, trace_memory=True)
+    try:
+        clean_data(raw_dataframe)
+    finally:
+        instrument.disable()
+    clean_data(raw_dataframe)  # disabled again: nothing recorded
+
+    assert len(sink.records) == 1
+    record = sink.records[0]
+    assert (record["stage"], record["rows_in"], record["rows_out"]) == ("clean_data", 3, 1)
+    assert record["ok"] and record["seconds"] >= 0 and "alloc_bytes" in record
+
+
+def test_load_batch_matches_in_memory_pipeline(tmp_path):
+    """Chunked loading, serial or across processes, should build the same batch as the in-memory path."""
+    path = tmp_path / "export.tsv"
+    pd.DataFrame({
+        "gbifID":           range(7),
+        "occurrenceID":     [f"urn:{i}" for i in range(7)],
+        "species":          ["Puffinus puffinus", "Morus bassanus", None, "Morus bassanus",
+                             "Puffinus puffinus", "Fratercula arctica", "Morus bassanus"],
+        "decimalLatitude":  ["42.3", "abc", "41.0", "-33.9", "64.1", "95", "51.5"],
+        "decimalLongitude": [-71.0, -70.5, -70.0, 18.4, -21.9, 0.0, -0.1],
+        "eventDate":        ["2023-06-01T08:00:00", "2023-07-15T09:30:00", "2023-08-20T10:00:00",
+                             "2023-12-24T07:15:00", "not a date", "2023-05-05T12:00:00",
+                             "2023-03-01T06:45:00"],
+        "countryCode":      ["US", "CA", "US", "ZA", "IS", "GB", "GB"],
+        "individualCount":  ["2", "1", "3", "two", "4", "1", "5"],
+    }).to_csv(path, sep="\t", index=False)
+
+    expected = list(build_batch(clean_data(pd.read_csv(path, sep="\t"))))
+    assert [obs.occurrenceID for obs in expected] == ["urn:0", "urn:6"]
+    assert list(load_batch(path, workers=1, chunksize=3)) == expected
+    assert list(load_batch(path, workers=2, chunksize=3)) == expected